@@ -0,0 +1,38 @@
+"""
+Run time and accuracy of the eigen-map distance metrics and solvers.
+
+Usage (from the repository root): python -m benchmarks.eigen_map_distance_benchmark
+"""
+import time
+
+import numpy as np
+from scipy.stats import spearmanr
+
+from pyoset.generic.eigen_map_distance import eigen_map_distance
+from pytests.spd_helpers import random_spd
+
+
+def main():
+    print(f"{'N':>4} {'K':>5} {'EIG [s]':>9} {'CHOLESKY [s]':>13} {'LOG_EUCL [s]':>13} {'rel. err':>9} {'rank corr':>10}")
+    for N, K in [(4, 100), (8, 200), (12, 300)]:
+        C = random_spd(N, K, dof=4 * N)
+        mask = np.triu(np.ones((K, K), dtype=bool), 1)
+
+        timings = {}
+        results = {}
+        for name, kwargs in [('EIG', {'method': 'EIG'}), ('CHOLESKY', {'method': 'CHOLESKY'}),
+                             ('LOG_EUCLIDEAN', {'metric': 'LOG_EUCLIDEAN'})]:
+            start = time.perf_counter()
+            results[name] = eigen_map_distance(C, **kwargs)
+            timings[name] = time.perf_counter() - start
+
+        exact = results['EIG'][mask]
+        approx = results['LOG_EUCLIDEAN'][mask]
+        rel_err = np.median(np.abs(approx - exact) / exact)
+        rank_corr = spearmanr(exact, approx)[0]
+        print(f"{N:>4} {K:>5} {timings['EIG']:>9.3f} {timings['CHOLESKY']:>13.3f} {timings['LOG_EUCLIDEAN']:>13.4f}"
+              f" {rel_err:>9.3f} {rank_corr:>10.4f}")
+
+
+if __name__ == '__main__':
+    main()
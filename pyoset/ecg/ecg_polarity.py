@@ -1,24 +1,316 @@
+import copy
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
 import numpy as np
 import scipy.signal as signal
-import scipy.stats as stats
 
-def lp_filter_zero_phase(ecg: np.ndarray, fc: float, fs: float) -> np.ndarray:
+from pyoset.generic.moments import Moments, moments
+
+# Minimum ratio of the reduced Nyquist frequency to the cut-off frequency in the multirate baseline filter
+_MULTIRATE_MARGIN = 10
+
+# Relative size below which the start-up transient of the zero-phase filter is neglected at chunk boundaries
+_TRANSIENT_TOL = 1e-12
+
+# Relative decay of the reduced-rate filter's edge transient after which the multirate baseline is used
+_EDGE_TOL = 1e-6
+
+# Number of cascaded moving averages of the CIC decimation and interpolation filters of the multirate baseline
+_MULTIRATE_ORDER = 3
+
+# Smallest decimation factor picked by factor='auto', below which the multirate baseline is not faster
+_MULTIRATE_MIN_FACTOR = 8
+
+
+def _transient_length(sos, tol=_TRANSIENT_TOL):
+    """
+    Number of samples after which the impulse response of an SOS filter has decayed below tol.
+
+    Args:
+        sos (np.ndarray): Second-order sections of the filter.
+        tol (float): Relative decay.
+
+    Returns:
+        int: Transient length in samples.
+    """
+    radius = np.max(np.abs(signal.sos2zpk(sos)[1]))
+    return int(np.ceil(np.log(tol) / np.log(radius))) + 3 * (2 * len(sos) + 1)
+
+
+class ECGPolarity:
+    """
+    Streaming ECG polarity of arbitrarily long or live multilead records.
+
+    Chunks of samples are fed through update(). The baseline is removed with a forward-backward (zero-phase)
+    second-order-section filter on each chunk extended by an overlap on both sides, sized from the filter's
+    transient length, and the skewness moments of the baseline-removed samples are merged across chunks.
+    Memory is O(chunk + overlap) per lead, and samples are processed with a latency of one overlap.
+
+    The baseline-removed samples equal those of ecg_polarity() over the whole record to about 1e-12 times the
+    signal amplitude (the residual of the filter transient), so the skewness agrees to that order and the
+    polarity is the same unless the skewness is within that tolerance of zero.
+
+    Args:
+        fs (float): Sampling frequency (Hz).
+        fc (float): Cut-off frequency for baseline removal (default = 3.0 Hz).
+        workers (int, optional): Number of threads the leads are filtered on; 1 (default) filters in this thread
+            and None uses all CPUs.
+    """
+
+    def __init__(self, fs, fc=3.0, workers=1):
+        self.fs = fs
+        self.fc = fc
+        self.workers = workers
+        self.sos = butter_sos(2, fc, fs, 'low')
+        self.overlap = _transient_length(self.sos)
+
+        self._buffer = None  # Left context followed by pending samples
+        self._num_context = 0  # Number of already processed samples at the start of the buffer
+        self._moments = None
+
+    def _process(self, end):
+        """
+        Remove the baseline of the pending samples up to buffer position end and merge their moments.
+        """
+        filtered = self._buffer - _sosfiltfilt_leads(self.sos, self._buffer, self.workers)
+        block = filtered[:, self._num_context:end]
+        if self._moments is None:
+            self._moments = Moments(block.shape[0], order=3)
+        self._moments.update(block)
+
+    def update(self, chunk):
+        """
+        Add the next chunk of the record.
+
+        Args:
+            chunk (np.ndarray): Next samples (leads x chunk_length).
+        """
+        chunk = np.asarray(chunk, dtype=float)
+        self._buffer = chunk if self._buffer is None else np.concatenate((self._buffer, chunk), axis=1)
+
+        # ✅ Process the samples with a full overlap of look-ahead, once enough samples are pending
+        end = self._buffer.shape[1] - self.overlap
+        if end - self._num_context >= self.overlap:
+            self._process(end)
+            start = max(0, end - self.overlap)
+            self._buffer = self._buffer[:, start:]
+            self._num_context = end - start
+
+    def polarity(self):
+        """
+        Polarity of the record so far, treating its last sample as the end of the record.
+
+        Returns:
+            polarity (np.ndarray): Boolean array (1 for positive, 0 for negative).
+            skw (np.ndarray): Skewness of the baseline-removed leads.
+        """
+        moments = self._moments
+        if self._buffer is not None and self._buffer.shape[1] > self._num_context:
+            # ✅ Pending samples, on a copy of the moments so that the stream can continue
+            self._moments = None if moments is None else copy.deepcopy(moments)
+            self._process(self._buffer.shape[1])
+            moments, self._moments = self._moments, moments
+        if moments is None:
+            raise ValueError("No samples have been added.")
+
+        skw = moments.skewness()
+        return skw >= 0, skw
+
+
+@lru_cache(maxsize=128)
+def _butter_sos(order: int, fc, fs: float, btype: str) -> tuple:
+    """
+    Cached Butterworth designs, as immutable nested tuples.
+    """
+    return tuple(map(tuple, signal.butter(order, fc, btype=btype, output='sos', fs=fs)))
+
+
+def butter_sos(order: int, fc, fs: float, btype: str = 'low') -> np.ndarray:
+    """
+    Memoized Butterworth filter design in second-order sections.
+
+    Parameters:
+    - order: Filter order
+    - fc: Cut-off frequency (Hz), or (low, high) pair for band filters
+    - fs: Sampling frequency (Hz)
+    - btype: 'low', 'high', 'bandpass' or 'bandstop'
+
+    Returns:
+    - sos: Second-order sections (a fresh copy of the cached design)
+    """
+    fc = tuple(float(f) for f in np.ravel(fc)) if np.ndim(fc) else float(fc)  # Hashable cache key
+    return np.array(_butter_sos(order, fc, float(fs), btype))
+
+
+def _sosfiltfilt(sos: np.ndarray, x: np.ndarray) -> np.ndarray:
+    """
+    Zero-phase filtering of each row of x in second-order sections.
+
+    A single section is its own transfer function, which lfilter runs faster than sosfilt over long records,
+    with the same padding and initial conditions, so it is filtered with filtfilt.
+    """
+    if len(sos) == 1:
+        return signal.filtfilt(sos[0, :3], sos[0, 3:], x, axis=1)
+    return signal.sosfiltfilt(sos, x, axis=1)
+
+
+def _sosfiltfilt_leads(sos: np.ndarray, x: np.ndarray, workers: int = 1) -> np.ndarray:
+    """
+    Zero-phase filtering of each row of x, with the rows split across a thread pool.
+
+    SciPy's filters release the GIL, so the threads run in parallel.
+
+    Parameters:
+    - sos: Second-order sections
+    - x: Signal (leads x samples)
+    - workers: Number of threads; 1 (default) filters in this thread and None uses all CPUs
+
+    Returns:
+    - Filtered signal
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, x.shape[0])
+    if workers <= 1:
+        return _sosfiltfilt(sos, x)
+
+    out = np.empty(x.shape, dtype=np.result_type(x, sos))
+    groups = np.array_split(np.arange(x.shape[0]), workers)
+
+    def filter_group(rows):
+        out[rows[0]:rows[-1] + 1] = _sosfiltfilt(sos, x[rows[0]:rows[-1] + 1])
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(filter_group, groups))
+    return out
+
+
+@lru_cache(maxsize=32)
+def _multirate_design(fc: float, fs: float, factor: int):
+    """
+    Cached filter designs of the multirate baseline filter.
+
+    The decimation and interpolation filters are _MULTIRATE_ORDER cascaded moving averages of factor samples
+    (a CIC filter), applied per block of factor samples as matrix products. Their nulls at the multiples of
+    fs / factor suppress the aliases and images of the baseline band. The reduced-rate filter has the poles
+    of the full-rate Butterworth filter mapped to fs / factor (p -> p**factor), so its response has the same
+    shape, and a first-order numerator fitted in least squares to the full-rate response over [0, 4 fc],
+    which also compensates the passband droop of the CIC filters.
+
+    Parameters:
+    - fc: Cut-off frequency (Hz)
+    - fs: Sampling frequency (Hz)
+    - factor: Decimation factor
+
+    Returns:
+    - decimation: Block weights of the decimation filter (factor x order)
+    - interpolation: Block weights of the interpolation filter (order x factor)
+    - sos: Second-order section of the reduced-rate low-pass filter
+    """
+    order = _MULTIRATE_ORDER
+    kernel = np.ones(1)
+    for _ in range(order):
+        kernel = np.convolve(kernel, np.ones(factor) / factor)
+    decimation = np.append(kernel, np.zeros(order * factor - len(kernel))).reshape(order, factor).T
+    interpolation = factor * decimation[:, ::-1].T
+
+    # ✅ Reduced-rate poles, and the numerator c0 + c1 z^-1 with |C|^2 = g0 + 2 g1 cos(w) fitted on the passband
+    a = np.real(np.poly(signal.butter(2, fc, fs=fs, output='zpk')[1]**factor))
+    nu = np.linspace(0, 4 * fc, 512)
+    w = 2 * np.pi * nu * factor / fs
+    target = np.abs(signal.sosfreqz(butter_sos(2, fc, fs, 'low'), nu, fs=fs)[1])**2
+    droop = (np.sinc(nu * factor / fs) / np.sinc(nu / fs))**(2 * order)
+    response = np.abs(signal.freqz(1, a, w)[1])**2 * droop
+    g0, g1 = np.linalg.lstsq(response[:, np.newaxis] * np.stack((np.ones_like(w), 2 * np.cos(w)), axis=1),
+                             target, rcond=None)[0]
+    c0 = np.sqrt((g0 + np.sqrt(g0**2 - 4 * g1**2)) / 2)
+    sos = np.concatenate(([c0, g1 / c0, 0], a))[np.newaxis]
+
+    for design in (decimation, interpolation, sos):
+        design.flags.writeable = False  # Shared by all callers
+    return decimation, interpolation, sos
+
+
+@lru_cache(maxsize=128)
+def _butter_transient(fc: float, fs: float, tol: float) -> int:
+    """
+    Cached transient length (samples) of the 2nd-order Butterworth low-pass filter; see _transient_length().
+    """
+    return _transient_length(butter_sos(2, fc, fs, 'low'), tol)
+
+
+def lp_filter_zero_phase(ecg: np.ndarray, fc: float, fs: float, factor=None, workers: int = 1) -> np.ndarray:
     """
     Mimic MATLAB's lp_filter_zero_phase function for baseline removal.
-    
+
+    With factor, the baseline is estimated at a reduced rate: the signal is decimated by factor with a CIC
+    filter, low-pass filtered forward-backward at fs / factor with a matched second-order section and
+    interpolated back to fs with the same CIC filter (see _multirate_design()). Both CIC stages cost a few
+    multiply-adds per sample, so the cost is mostly that of the reduced-rate filter. Near the record ends the
+    baseline is filtered at the full rate over the low-pass filter's transient (plus the convergence overlap
+    of the backward pass), so it equals the full-rate baseline there to about 1e-12. In the interior, the
+    response differs from the full-rate one by less than 1e-5 and the aliases and images are attenuated to
+    about 1e-4 for a factor that keeps the reduced Nyquist frequency at 10 fc, which factor='auto' picks.
+    Below a factor of 8 (_MULTIRATE_MIN_FACTOR) the CIC stages cost about as much as the full-rate filter,
+    so 'auto' filters at the full rate there.
+
+    The 2nd-order Butterworth filter is designed in second-order sections, cached by butter_sos() (and the
+    multirate designs per (fc, fs, factor)); its single section is applied as a transfer function, as fast as
+    filtfilt(b, a).
+
     Parameters:
     - ecg: ECG signal (leads x samples)
     - fc: Cut-off frequency (Hz)
     - fs: Sampling frequency (Hz)
-    
+    - factor: Decimation factor (int or 'auto'); None (default) filters at the full rate
+    - workers: Number of threads the leads are split across; 1 (default) filters in this thread and None uses
+      all CPUs
+
     Returns:
     - Baseline signal
     """
-    nyquist = fs / 2
-    b, a = signal.butter(2, fc / nyquist, btype='low', analog=False)  # 2nd-order Butterworth
-    return signal.filtfilt(b, a, ecg, axis=1)  # Zero-phase filtering like MATLAB
+    if factor == 'auto':
+        factor = int(fs / (2 * _MULTIRATE_MARGIN * fc))
+        if factor < _MULTIRATE_MIN_FACTOR:
+            factor = None
+    sos = butter_sos(2, fc, fs, 'low')  # 2nd-order Butterworth
+    if factor is None or factor == 1:
+        return _sosfiltfilt_leads(sos, ecg, workers)  # Zero-phase filtering like MATLAB
+
+    order = _MULTIRATE_ORDER
+    decimation, interpolation, low_sos = _multirate_design(float(fc), float(fs), factor)
+    C, T = ecg.shape
+    edge = order * factor + _butter_transient(fc, fs, _EDGE_TOL)
+    span = edge + _butter_transient(fc, fs, _TRANSIENT_TOL)
+    if T <= 2 * span:
+        return _sosfiltfilt_leads(sos, ecg, workers)
 
-def ecg_polarity(ecg: np.ndarray, fs: float, fc: float = 3.0) -> np.ndarray:
+    # ✅ Decimate: block sums of the CIC filter, shifted and added
+    M = T // factor
+    blocks = ecg[:, :M * factor].reshape(C, M, factor) @ decimation
+    K = M - order + 1
+    low = blocks[:, :K, 0].copy()
+    for n in range(1, order):
+        low += blocks[:, n:n + K, n]
+
+    # ✅ Filter at the reduced rate and interpolate back, one block of factor samples per reduced-rate sample
+    low = _sosfiltfilt_leads(low_sos, low, workers)
+    baseline = np.empty((C, T), dtype=low.dtype)
+    n = K - order + 1
+    start = (order - 1) * factor
+    np.matmul(np.lib.stride_tricks.sliding_window_view(low, order, axis=1), interpolation,
+              out=baseline[:, start:start + n * factor].reshape(C, n, factor))
+
+    # ✅ Full-rate baseline near the record ends
+    baseline[:, :edge] = _sosfiltfilt_leads(sos, ecg[:, :span], workers)[:, :edge]
+    baseline[:, -edge:] = _sosfiltfilt_leads(sos, ecg[:, -span:], workers)[:, -edge:]
+    return baseline
+
+
+def ecg_polarity(ecg: np.ndarray, fs: float, fc: float = 3.0, chunk_size: int = None, factor=None,
+                 workers: int = 1) -> np.ndarray:
     """
     Calculate ECG polarity by removing baseline and computing skewness.
     
@@ -26,12 +318,24 @@ def ecg_polarity(ecg: np.ndarray, fs: float, fc: float = 3.0) -> np.ndarray:
     - ecg: (leads x samples) Multilead ECG matrix
     - fs: Sampling frequency (Hz)
     - fc: Cut-off frequency for baseline removal (default = 3.0 Hz)
+    - chunk_size: If given, the record (e.g. a memory-mapped array) is processed in chunks of this many
+      samples with O(chunk_size) memory; see ECGPolarity for the agreement with the batch result
+    - factor: Decimation factor of a multirate baseline filter (int or 'auto'); see lp_filter_zero_phase()
+    - workers: Number of threads for the baseline filter, also in the chunked mode; see lp_filter_zero_phase()
     
     Returns:
     - polarity: Boolean array (1 for positive, 0 for negative)
     """
-    baseline = lp_filter_zero_phase(ecg, fc, fs)  # Baseline removal
-    skw = stats.skew(ecg - baseline, axis=1)  # Compute skewness
+    if chunk_size is not None:
+        if factor is not None:
+            raise ValueError("The chunked mode filters at the full rate; factor is not supported.")
+        estimator = ECGPolarity(fs, fc, workers)
+        for start in range(0, ecg.shape[1], chunk_size):
+            estimator.update(ecg[:, start:start + chunk_size])
+        return estimator.polarity()[0]
+
+    baseline = lp_filter_zero_phase(ecg, fc, fs, factor, workers)  # Baseline removal
+    skw = moments(ecg - baseline, order=3).skewness()  # Compute skewness
     polarity = skw >= 0  # Positive skew means normal polarity
     
     return polarity
\ No newline at end of file
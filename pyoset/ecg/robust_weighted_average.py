@@ -1,52 +1,285 @@
+from collections import namedtuple
+
 import numpy as np
 
-def robust_weighted_average(x):
+RobustWeightedAverageResult = namedtuple('RobustWeightedAverageResult', ['mn', 'vr_mn', 'md', 'vr_md'])
+
+
+# Number of beat samples per block of records, so that the temporaries of a block stay in cache
+_BLOCK_ELEMENTS = 1 << 18
+
+
+def _weighted_average(x, center, mask, count, full):
     """
-    Robust weighted averaging of biomedical signals.
+    Inverse residual variance weighted average of the beats of each record, and its variance.
 
     Args:
-        x (np.ndarray): An (N x T) matrix containing N ensembles of a noisy event-related signal of length T.
+        x (np.ndarray): Beats (R x N x T), zero where masked.
+        center (np.ndarray): Initial mean or median beat of each record (R x T).
+        mask (np.ndarray): Valid beats (R x N).
+        count (np.ndarray): Number of valid beats of each record (R,).
+        full (bool): True if all beats are valid.
 
     Returns:
-        mn (np.ndarray): The robust weighted average over the N rows of x.
-        vr_mn (np.ndarray): The variance of the average beat across the N rows of x.
-        md (np.ndarray, optional): The robust weighted median over the N rows of x.
-        vr_md (np.ndarray, optional): The variance of the median beat across the N rows of x.
-    """
-    num_beats, _ = x.shape
-
-    if num_beats > 1:
-        # ✅ Average beat (mean)
-        mn0 = np.mean(x, axis=0)
-        noise0 = x - mn0
-        vr = np.var(noise0, axis=1, ddof=0)
-        sm = np.sum(1 / vr)
-        weight = 1 / (vr * sm)
-        mn = np.dot(weight, x)
-        
-        noise = x - mn
-        vr_mn = np.var(noise, axis=0, ddof=0)
-
-        # ✅ Median calculation (optional)
-        md, vr_md = None, None
-        if x.shape[0] > 2:  # Check if median is required
-            md0 = np.median(x, axis=0)
-            noise0 = x - md0
-            vr = np.var(noise0, axis=1, ddof=0)
-            sm = np.sum(1 / vr)
-            weight = 1 / (vr * sm)
-            md = np.dot(weight, x)
-            
-            noise = x - md
-            vr_md = np.var(noise, axis=0, ddof=0)
-
-        return (mn, vr_mn, md, vr_md) if md is not None else (mn, vr_mn)
+        np.ndarray: Weighted average (R x T).
+        np.ndarray: Variance of the beats around the average (R x T).
+    """
+    noise0 = x - center[:, np.newaxis, :]
+    vr = np.var(noise0, axis=2, ddof=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sm = np.sum(np.where(mask, 1 / vr, 0), axis=1, keepdims=True)
+        weight = np.where(mask, 1 / (vr * sm), 0)
+    weight[count == 1] = mask[count == 1]  # Single beat case
+    avg = np.matmul(weight[:, np.newaxis, :], x)[:, 0]
+
+    # ✅ Variance across the valid beats of the residuals
+    noise = x - avg[:, np.newaxis, :]
+    if full:
+        return avg, np.var(noise, axis=1, ddof=0)
+    noise[~mask] = 0
+    noise -= np.sum(noise, axis=1, keepdims=True) / count[:, np.newaxis, np.newaxis]
+    noise[~mask] = 0
+    return avg, np.sum(noise**2, axis=1) / count[:, np.newaxis]
+
 
+def _robust_weighted_average(x, mask, count):
+    """
+    Robust weighted mean and median of a block of records; see robust_weighted_average().
+    """
+    full = np.all(mask)
+    if not full:
+        x = np.where(mask[:, :, np.newaxis], x, 0)
+
+    # ✅ Average beat (mean)
+    mn0 = np.sum(x, axis=1) / count[:, np.newaxis]
+    mn, vr_mn = _weighted_average(x, mn0, mask, count, full)
+
+    # ✅ Average beat (median), from the sorted valid beats of each record
+    if full:
+        md0 = np.median(x, axis=1)
     else:
-        # ✅ Single row case
-        mn = x[0]
-        vr_mn = np.zeros_like(x[0])
-        md = x[0] if x.shape[0] > 2 else None
-        vr_md = np.zeros_like(x[0]) if md is not None else None
+        sorted_x = np.sort(np.where(mask[:, :, np.newaxis], x, np.inf), axis=1)
+        lower = np.take_along_axis(sorted_x, ((count - 1) // 2)[:, np.newaxis, np.newaxis], axis=1)[:, 0]
+        upper = np.take_along_axis(sorted_x, (count // 2)[:, np.newaxis, np.newaxis], axis=1)[:, 0]
+        md0 = (lower + upper) / 2
+    md, vr_md = _weighted_average(x, md0, mask, count, full)
+
+    return mn, vr_mn, md, vr_md
+
+
+def _merge_row_moments(moments, block):
+    """
+    Merge the per-row mean and sum of squared deviations of a block of columns into running moments.
+
+    Args:
+        moments (list): Running [count, mean, M2] of each row; updated in place.
+        block (np.ndarray): Block of columns (N x B); overwritten with its row-centered values.
+    """
+    count, mean, m2 = moments
+    n_b = block.shape[1]
+    mean_b = np.mean(block, axis=1)
+    block -= mean_b[:, np.newaxis]
+    m2_b = np.einsum('ij,ij->i', block, block)
+
+    # ✅ Chan et al. pairwise update
+    total = count + n_b
+    delta = mean_b - mean
+    moments[0] = total
+    moments[1] = mean + delta * n_b / total
+    moments[2] = m2 + m2_b + delta**2 * count * n_b / total
+
+
+def _robust_weighted_average_blocks(x, block_size):
+    """
+    Robust weighted mean and median of an (N x T) matrix, streamed over blocks of block_size columns.
+
+    The initial mean and median beats are computed per column, and the per-beat residual variances are merged
+    over the column blocks from their block moments, in a first pass. The weighted averages and their
+    variances are computed per column in a second pass. Apart from the outputs and O(N) statistics, a single
+    (N x block_size) buffer is used, so x can be a memory-mapped array.
+    """
+    N, T = x.shape
+    buffer = np.empty(N * min(block_size, T))
+    moments = {'mn': [0, np.zeros(N), np.zeros(N)], 'md': [0, np.zeros(N), np.zeros(N)]}
+    centers = {'mn': np.empty(T), 'md': np.empty(T)}
+
+    # ✅ First pass: initial mean and median beats, per-beat residual moments
+    for start in range(0, T, block_size):
+        end = min(start + block_size, T)
+        xb = x[:, start:end]
+        b = buffer[:N * (end - start)].reshape(N, end - start)  # Contiguous view of the buffer
+
+        centers['mn'][start:end] = np.mean(xb, axis=0)
+        b[:] = xb
+        centers['md'][start:end] = np.median(b, axis=0, overwrite_input=True)  # Partition-based, in place
+        for key in ['mn', 'md']:
+            np.subtract(xb, centers[key][start:end], out=b)
+            _merge_row_moments(moments[key], b)
+
+    weights = {}
+    for key in ['mn', 'md']:
+        vr = moments[key][2] / T
+        weights[key] = np.ones(1) if N == 1 else 1 / (vr * np.sum(1 / vr))
+
+    # ✅ Second pass: weighted averages and their variances across the beats
+    result = {key: (np.empty(T), np.empty(T)) for key in ['mn', 'md']}
+    for start in range(0, T, block_size):
+        end = min(start + block_size, T)
+        xb = x[:, start:end]
+        b = buffer[:N * (end - start)].reshape(N, end - start)
+
+        for key in ['mn', 'md']:
+            avg, vr_avg = result[key]
+            b[:] = xb
+            avg[start:end] = np.dot(weights[key], b)
+            b -= avg[start:end]
+            b -= np.mean(b, axis=0)
+            vr_avg[start:end] = np.einsum('ij,ij->j', b, b) / N
+
+    return result['mn'] + result['md']
+
+
+def robust_weighted_average(x, counts=None, mask=None, block_size=None):
+    """
+    Robust weighted averaging of biomedical signals.
+
+    Many records (or leads) can be averaged at once by giving an (R x N x T) tensor; the records can have
+    different numbers of beats, given by counts (the first counts[r] beats of record r are used) or by a
+    boolean mask of the valid beats. The records are processed in blocks small enough to stay in cache.
+
+    For very large ensembles (e.g. memory-mapped Holter beats), block_size streams an (N x T) matrix over
+    blocks of columns: the per-beat variances are accumulated from block moments, the medians are partition
+    based and only one (N x block_size) temporary is held. The results match the in-memory path to rounding.
+
+    Args:
+        x (np.ndarray): An (N x T) matrix containing N ensembles of a noisy event-related signal of length T,
+            or an (R x N x T) tensor of R such matrices.
+        counts (np.ndarray, optional): Number of valid beats of each of the R records.
+        mask (np.ndarray, optional): Valid beats, (N,) or (R x N) boolean array.
+        block_size (int, optional): Number of columns per block for a column-streamed (N x T) matrix.
+
+    Returns:
+        RobustWeightedAverageResult: Named tuple of
+            mn (np.ndarray): The robust weighted average over the N rows of x.
+            vr_mn (np.ndarray): The variance of the average beat across the N rows of x.
+            md (np.ndarray): The robust weighted median over the N rows of x.
+            vr_md (np.ndarray): The variance of the median beat across the N rows of x.
+        Each is of length T, or (R x T) for a 3-D input.
+    """
+    if block_size is not None:
+        if np.ndim(x) != 2 or counts is not None or mask is not None:
+            raise ValueError("block_size requires an (N x T) matrix without counts or mask.")
+        return RobustWeightedAverageResult(*_robust_weighted_average_blocks(x, block_size))
+
+    x = np.asarray(x, dtype=float)
+    single = x.ndim == 2
+    x = x[np.newaxis] if single else x
+    R, num_beats, T = x.shape
+
+    if mask is None:
+        mask = np.ones((R, num_beats), dtype=bool)
+        if counts is not None:
+            mask &= np.arange(num_beats) < np.reshape(counts, (-1, 1))
+    mask = np.broadcast_to(np.asarray(mask, dtype=bool).reshape(-1, num_beats), (R, num_beats))
+    count = np.sum(mask, axis=1)
+    if np.any(count == 0):
+        raise ValueError("Every record must have at least one valid beat.")
+
+    result = RobustWeightedAverageResult(*(np.empty((R, T)) for _ in range(4)))
+    step = max(1, _BLOCK_ELEMENTS // max(1, num_beats * T))
+    for start in range(0, R, step):
+        block = slice(start, start + step)
+        for out, value in zip(result, _robust_weighted_average(x[block], mask[block], count[block])):
+            out[block] = value
+
+    if single:
+        return RobustWeightedAverageResult(*(value[0] for value in result))
+    return result
+
+
+class RobustWeightedAverage:
+    """
+    Streaming robust weighted average of a live stream of beats.
+
+    Each beat is added with update() in O(T) time and memory, and the updated average beat and its variance
+    are returned. Each beat is weighted by the inverse variance of its residual, as in
+    robust_weighted_average(), but the residual is taken once, when the beat arrives, against the unweighted
+    mean of the beats seen so far (including the beat itself) instead of the final mean of all beats. The
+    first beat is weighted when the second arrives. Hence for up to two beats the result equals the batch
+    mean and variance (mn, vr_mn); with more beats the weights of the early beats are based on fewer beats,
+    and approach the batch weights as the running mean settles.
+
+    With a forgetting factor lambda < 1, the sums of all past beats are scaled by lambda at every new beat, so
+    the average follows slow changes of the beat morphology over an effective memory of 1 / (1 - lambda)
+    beats. The median outputs of robust_weighted_average() have no fixed-memory streaming counterpart and are
+    not provided.
+
+    Args:
+        forgetting (float): Forgetting factor lambda in (0, 1] (default: 1, no forgetting).
+    """
+
+    def __init__(self, forgetting=1.0):
+        if not 0 < forgetting <= 1:
+            raise ValueError("forgetting must be in (0, 1].")
+
+        self.forgetting = forgetting
+        self.num_beats = 0
+        self.mn = None
+        self.vr_mn = None
+
+        self._ref = None  # First beat; all sums are of the beats minus this reference
+        self._count = 0.0
+        self._sum = None
+        self._sum_sq = None
+        self._weight_sum = 0.0
+        self._weighted_sum = None
+
+    def update(self, beat):
+        """
+        Add a beat to the average.
+
+        Args:
+            beat (np.ndarray): Next beat of length T.
+
+        Returns:
+            mn (np.ndarray): The robust weighted average of the beats so far.
+            vr_mn (np.ndarray): The variance of the average beat across the beats so far.
+        """
+        beat = np.asarray(beat, dtype=float)
+        lam = self.forgetting
+        self.num_beats += 1
+
+        if self._ref is None:
+            # ✅ Single beat case
+            self._ref = beat.copy()
+            self._count = 1.0
+            self._sum = np.zeros_like(beat)
+            self._sum_sq = np.zeros_like(beat)
+            self._weighted_sum = np.zeros_like(beat)
+            self.mn = beat.copy()
+            self.vr_mn = np.zeros_like(beat)
+            return self.mn, self.vr_mn
+
+        # ✅ Unweighted running sums and mean
+        d = beat - self._ref
+        self._count = lam * self._count + 1
+        self._sum *= lam
+        self._sum += d
+        self._sum_sq *= lam
+        self._sum_sq += d**2
+        mn0 = self._sum / self._count
+
+        if self.num_beats == 2:
+            # ✅ Weight of the first beat, at the same reference as the second; discounted with the sums below
+            self._weight_sum = 1 / np.var(-mn0)
+
+        # ✅ Inverse residual variance weight of the new beat
+        weight = 1 / np.var(d - mn0)
+        self._weight_sum = lam * self._weight_sum + weight
+        self._weighted_sum *= lam
+        self._weighted_sum += weight * d
 
-        return (mn, vr_mn, md, vr_md) if md is not None else (mn, vr_mn)
+        mn = self._weighted_sum / self._weight_sum
+        self.mn = self._ref + mn
+        self.vr_mn = self._sum_sq / self._count - 2 * mn * self._sum / self._count + mn**2
+        return self.mn, self.vr_mn
@@ -0,0 +1,326 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+from scipy.linalg import eig
+
+from pyoset.generic.quantile_sketch import QuantileSketch
+
+# Stacked matrices (and whitening factors) shared with the pool workers, set by _init_worker
+_SHARED = {}
+
+
+def _whitening_factors(C):
+    """
+    Inverse lower Cholesky factors W_k = L_k^-1 of a stack of SPD matrices C_k = L_k L_k^T.
+
+    Args:
+        C (np.ndarray): Stack of K matrices (K x N x N).
+
+    Returns:
+        np.ndarray: Stack of K inverse Cholesky factors (K x N x N).
+    """
+    N = C.shape[1]
+    L = np.linalg.cholesky(C)
+    return np.linalg.solve(L, np.broadcast_to(np.eye(N), C.shape))
+
+
+def _whitened_distances(Ci, Wj):
+    """
+    Eigen-map distances between every matrix of Ci and the matrix whitened by Wj.
+
+    The generalized eigenvalues of (C_i, C_j) are the eigenvalues of the symmetric matrix W_j C_i W_j^T, which
+    are computed for all i at once with a batched symmetric eigensolver.
+
+    Args:
+        Ci (np.ndarray): Stack of matrices (M x N x N).
+        Wj (np.ndarray): Inverse Cholesky factor of C_j (N x N).
+
+    Returns:
+        np.ndarray: Distances sum(log(lambda)^2) of length M.
+    """
+    whitened = Wj @ Ci @ Wj.T
+    lambdas = np.linalg.eigvalsh(whitened)
+    return np.sum(np.log(np.abs(lambdas))**2, axis=1)
+
+
+def _log_vectors(Ck):
+    """
+    Centered, vectorized matrix logarithms of a stack of SPD matrices, one symmetric eigendecomposition each.
+
+    Args:
+        Ck (np.ndarray): Stack of K matrices (K x N x N).
+
+    Returns:
+        np.ndarray: Vectorized logarithms (K x N^2), centered on their mean.
+    """
+    lambdas, U = np.linalg.eigh(Ck)
+    logs = (U * np.log(np.abs(lambdas))[:, np.newaxis, :]) @ np.swapaxes(U, 1, 2)
+    X = logs.reshape(len(Ck), -1)
+    return X - np.mean(X, axis=0)  # Centering reduces the cancellation in the Gram identity
+
+
+def _log_euclidean_distances(Ck):
+    """
+    Squared log-Euclidean distances ||log(C_i) - log(C_j)||_F^2 between a stack of SPD matrices.
+
+    Each matrix logarithm takes one symmetric eigendecomposition; all pairwise distances then follow from one
+    Gram matrix of the (centered) vectorized logarithms.
+
+    Args:
+        Ck (np.ndarray): Stack of K matrices (K x N x N).
+
+    Returns:
+        np.ndarray: Symmetric (K x K) distance matrix.
+    """
+    X = _log_vectors(Ck)
+    G = X @ X.T
+    sq_norms = np.diag(G)
+    delta = np.maximum(sq_norms[:, np.newaxis] + sq_norms[np.newaxis, :] - 2 * G, 0)
+    np.fill_diagonal(delta, 0)
+    return delta
+
+
+def _tile_distances(Ck, W, i0, i1, j0, j1):
+    """
+    Eigen-map distances of one upper-triangular tile, rows i0:i1 against columns j0:j1 (only pairs i < j).
+
+    Args:
+        Ck (np.ndarray): Stack of K matrices (K x N x N).
+        W (np.ndarray or None): Inverse Cholesky factors of Ck for the 'CHOLESKY' method, None for 'EIG'.
+        i0, i1, j0, j1 (int): Row and column ranges of the tile.
+
+    Returns:
+        np.ndarray: Tile of the distance matrix ((i1 - i0) x (j1 - j0)); entries with i >= j are zero.
+    """
+    tile = np.zeros((i1 - i0, j1 - j0))
+    for j in range(j0, j1):
+        end = min(i1, j)
+        if end <= i0:
+            continue
+        if W is None:
+            for i in range(i0, end):
+                lambdas = eig(Ck[i], Ck[j])[0]
+                tile[i - i0, j - j0] = np.sum(np.log(np.abs(lambdas))**2)
+        else:
+            tile[:end - i0, j - j0] = _whitened_distances(Ck[i0:end], W[j])
+    return tile
+
+
+def _upper_tiles(K, num_tiles):
+    """
+    Split the strict upper triangle of a (K x K) matrix into square tiles of about equal work.
+
+    Args:
+        K (int): Number of matrices.
+        num_tiles (int): Approximate number of tiles wanted.
+
+    Returns:
+        list: (i0, i1, j0, j1) tiles, largest first.
+    """
+    # ✅ nb blocks per side give nb (nb + 1) / 2 tiles; diagonal tiles hold half the pairs of the others
+    nb = max(1, min(K, int(np.ceil(np.sqrt(2 * num_tiles)))))
+    edges = np.linspace(0, K, nb + 1).astype(int)
+    tiles = [(edges[a], edges[a + 1], edges[c], edges[c + 1]) for a in range(nb) for c in range(a, nb)]
+    return sorted(tiles, key=lambda t: -(t[1] - t[0]) * (t[3] - t[2]) / (2 if t[0] == t[2] else 1))
+
+
+def _init_worker(name, shape, with_factors):
+    """
+    Attach a pool worker to the shared stack of matrices (and whitening factors).
+    """
+    shm = shared_memory.SharedMemory(name=name)
+    arrays = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+    _SHARED['shm'] = shm
+    _SHARED['Ck'] = arrays[0]
+    _SHARED['W'] = arrays[1] if with_factors else None
+
+
+def _shared_tile_distances(tile):
+    """
+    Distances of one tile from the shared matrices; runs in the worker processes.
+    """
+    return _tile_distances(_SHARED['Ck'], _SHARED['W'], *tile)
+
+
+def _iter_tile_distances(Ck, W, tiles, workers):
+    """
+    Distances of upper-triangular tiles, computed in this process or on a process pool.
+
+    For workers > 1 the matrices (and factors) are placed once in shared memory, so only the tile bounds and
+    results are sent between processes.
+
+    Args:
+        Ck (np.ndarray): Stack of K matrices (K x N x N).
+        W (np.ndarray or None): Inverse Cholesky factors of Ck for the 'CHOLESKY' method, None for 'EIG'.
+        tiles (list): (i0, i1, j0, j1) tiles; see _tile_distances().
+        workers (int): Number of worker processes.
+
+    Yields:
+        tuple: Tile bounds and the tile of the distance matrix, in the order of tiles.
+    """
+    if workers == 1 or len(tiles) < 2:
+        for tile in tiles:
+            yield tile, _tile_distances(Ck, W, *tile)
+        return
+
+    # ✅ Shared-memory copy of the matrices (and factors) for the pool workers
+    arrays = [Ck] if W is None else [Ck, W]
+    shape = (len(arrays),) + Ck.shape
+    shm = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)) * 8)
+    try:
+        shared = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+        for a, array in enumerate(arrays):
+            shared[a] = array
+
+        with ProcessPoolExecutor(max_workers=min(workers, len(tiles)), initializer=_init_worker,
+                                 initargs=(shm.name, shape, W is not None)) as pool:
+            yield from zip(tiles, pool.map(_shared_tile_distances, tiles))
+        del shared
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def eigen_map_distance(C, method='EIG', workers=1, metric='RIEMANNIAN'):
+    """
+    Pairwise eigen-map distances between positive definite matrices.
+
+    The distance between C_i and C_j is sum(log(lambda)^2) over the generalized eigenvalues lambda of
+    (C_i, C_j), i.e. the squared affine-invariant Riemannian distance.
+
+    With workers > 1 the upper triangle is split into tiles of about equal work, which are dispatched to a
+    process pool. The matrices are placed once in shared memory, so only the tile bounds and results are
+    sent between processes.
+
+    With metric='LOG_EUCLIDEAN', the distance is approximated by ||log(C_i) - log(C_j)||_F^2, which needs one
+    eigendecomposition per matrix instead of one generalized eigenproblem per pair: O(K N^3 + K^2 N^2)
+    instead of O(K^2 N^3). It equals the exact distance for commuting matrices and is meant for screening;
+    method and workers are then not used.
+
+    Args:
+        C (np.ndarray): Tensor of shape (N, N, K) with K positive definite matrices.
+        method (str): 'EIG' (general generalized eigensolver per pair, default) or 'CHOLESKY' (each C_j is
+            Cholesky-factored once, the other matrices are whitened with it and their eigenvalues computed with
+            batched symmetric eigensolvers; requires strictly positive definite matrices).
+        workers (int, optional): Number of worker processes; 1 (default) computes in this process and None
+            uses all CPUs.
+        metric (str): 'RIEMANNIAN' (exact distance, default) or 'LOG_EUCLIDEAN' (approximation).
+
+    Returns:
+        delta (np.ndarray): Symmetric (K x K) eigen-map distance matrix.
+    """
+    if method not in ['EIG', 'CHOLESKY']:
+        raise ValueError("Invalid method. Use 'EIG' or 'CHOLESKY'.")
+    if metric not in ['RIEMANNIAN', 'LOG_EUCLIDEAN']:
+        raise ValueError("Invalid metric. Use 'RIEMANNIAN' or 'LOG_EUCLIDEAN'.")
+
+    if metric == 'LOG_EUCLIDEAN':
+        return _log_euclidean_distances(np.ascontiguousarray(np.moveaxis(C, 2, 0), dtype=np.float64))
+
+    K = C.shape[2]
+    delta = np.zeros((K, K))
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if method == 'EIG' and workers == 1:
+        # ✅ Pairwise eigen-map distance calculation
+        for i in range(K - 1):
+            for j in range(i + 1, K):
+                lambdas = eig(C[:, :, i], C[:, :, j])[0]
+                delta[i, j] = np.sum(np.log(np.abs(lambdas))**2)
+                delta[j, i] = delta[i, j]  # Symmetric matrix
+        return delta
+
+    # ✅ Stack of matrices and their whitening factors, each factored once
+    Ck = np.ascontiguousarray(np.moveaxis(C, 2, 0), dtype=np.float64)
+    W = _whitening_factors(Ck) if method == 'CHOLESKY' else None
+
+    if workers == 1 or K < 2:
+        for j in range(1, K):
+            delta[:j, j] = _whitened_distances(Ck[:j], W[j])
+            delta[j, :j] = delta[:j, j]  # Symmetric matrix
+        return delta
+
+    tiles = _upper_tiles(K, 4 * workers)
+    for (i0, i1, j0, j1), tile in _iter_tile_distances(Ck, W, tiles, workers):
+        delta[i0:i1, j0:j1] += tile
+
+    return delta + delta.T  # Symmetric matrix
+
+
+def _knn_distances(C, n_neighbors, method='EIG', workers=1, metric='RIEMANNIAN', block_size=1024, sketch_size=4096):
+    """
+    Nearest-neighbour eigen-map distances of every matrix and the median of all pairwise distances, without
+    forming the (K x K) distance matrix.
+
+    The upper triangle is computed in square tiles of block_size rows and columns (on a process pool with
+    workers > 1, as in eigen_map_distance()). Each tile updates the running n_neighbors + 1 smallest distances
+    of its rows and columns (each matrix is its own nearest neighbour) and a quantile sketch of the pairwise
+    distances, so the memory is O(K n_neighbors + block_size^2). The median is exact while there are fewer
+    than sketch_size pairs, and within the rank error of QuantileSketch otherwise.
+
+    Args:
+        C (np.ndarray): Tensor of shape (N, N, K) with K positive definite matrices.
+        n_neighbors (int): Number of nearest neighbours per matrix, besides itself.
+        method, workers, metric: As in eigen_map_distance().
+        block_size (int): Number of rows and columns per tile (default: 1024).
+        sketch_size (int): Compactor capacity of the median sketch (default: 4096).
+
+    Returns:
+        indices (np.ndarray): Nearest neighbours of each matrix, itself included (K x k), k = min(n_neighbors + 1, K).
+        distances (np.ndarray): Distances to the nearest neighbours (K x k).
+        median (float): Median of the pairwise distances.
+    """
+    if method not in ['EIG', 'CHOLESKY']:
+        raise ValueError("Invalid method. Use 'EIG' or 'CHOLESKY'.")
+    if metric not in ['RIEMANNIAN', 'LOG_EUCLIDEAN']:
+        raise ValueError("Invalid metric. Use 'RIEMANNIAN' or 'LOG_EUCLIDEAN'.")
+
+    Ck = np.ascontiguousarray(np.moveaxis(C, 2, 0), dtype=np.float64)
+    K = len(Ck)
+    k = min(n_neighbors + 1, K)
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    edges = list(range(0, K, block_size)) + [K]
+    tiles = [(edges[a], edges[a + 1], edges[c], edges[c + 1]) for a in range(len(edges) - 1)
+             for c in range(a, len(edges) - 1)]
+
+    if metric == 'LOG_EUCLIDEAN':
+        X = _log_vectors(Ck)
+        sq_norms = np.einsum('ij,ij->i', X, X)
+        tile_iter = ((tile, np.maximum(sq_norms[tile[0]:tile[1], np.newaxis] + sq_norms[np.newaxis, tile[2]:tile[3]]
+                                       - 2 * X[tile[0]:tile[1]] @ X[tile[2]:tile[3]].T, 0)) for tile in tiles)
+    else:
+        W = _whitening_factors(Ck) if method == 'CHOLESKY' else None
+        tile_iter = _iter_tile_distances(Ck, W, tiles, workers)
+
+    indices = np.full((K, k), -1)
+    distances = np.full((K, k), np.inf)
+    sketch = QuantileSketch(1, sketch_size, seed=0)
+
+    def update(rows, cols, tile):
+        # Merge the candidate columns of a tile into the running nearest neighbours of its rows
+        cand = np.hstack((distances[rows], tile))
+        cand_idx = np.hstack((indices[rows], np.broadcast_to(cols, tile.shape)))
+        keep = np.argpartition(cand, k - 1, axis=1)[:, :k]
+        distances[rows] = np.take_along_axis(cand, keep, axis=1)
+        indices[rows] = np.take_along_axis(cand_idx, keep, axis=1)
+
+    for (i0, i1, j0, j1), tile in tile_iter:
+        rows, cols = np.arange(i0, i1), np.arange(j0, j1)
+        if i0 == j0:
+            # ✅ Diagonal tile: pairs i < j only, mirrored, with each matrix at distance zero from itself
+            upper = np.triu(tile, 1)
+            sketch.update(upper[np.triu_indices(i1 - i0, 1)][np.newaxis, :])
+            update(rows, cols, upper + upper.T)
+        else:
+            sketch.update(tile.reshape(1, -1))
+            update(rows, cols, tile)
+            update(cols, rows, tile.T)
+
+    median = sketch.percentile(50)[0] if K > 1 else 0.0
+    return indices, distances, median
@@ -0,0 +1,171 @@
+import hashlib
+import os
+
+import numpy as np
+
+from pyoset.generic.eigen_map_distance import _tile_distances, _whitening_factors
+from pyoset.generic.laplacian_eigenmap import _eigenmap
+
+
+class IncrementalEigenmap:
+    """
+    Laplacian eigen-map of a growing set of positive definite matrices.
+
+    The eigen-map distance matrix is kept between calls: appending M matrices to K computes only the new
+    K x M and M x M distances, which are bitwise equal to recomputing the full matrix with eigen_map_distance().
+    With cache_dir, the distances are also stored on disk under a hash of the matrices' contents, so a later
+    session appending the same matrices (e.g. a growing archive) reloads the longest cached prefix and
+    computes only the remaining rows and columns. Each append stores only its new columns, linked to the
+    cached prefix they extend, so the cache grows with the distance matrix and not with the number of appends.
+
+    New matrices can also be embedded without adding them (transform), by the Nystrom extension of the last
+    eigen-decomposition.
+
+    Args:
+        kappa (float): Median factor for distance normalization.
+        method (str): Pairwise distance solver, 'EIG' (default) or 'CHOLESKY'; see eigen_map_distance().
+        n_neighbors (int, optional): Number of nearest neighbours per node in a sparse similarity graph.
+        n_eigs (int, optional): Number of largest eigenpairs to compute.
+        cache_dir (str, optional): Directory of the on-disk distance cache.
+    """
+
+    def __init__(self, kappa, method='EIG', n_neighbors=None, n_eigs=None, cache_dir=None):
+        if method not in ['EIG', 'CHOLESKY']:
+            raise ValueError("Invalid method. Use 'EIG' or 'CHOLESKY'.")
+
+        self.kappa = kappa
+        self.method = method
+        self.n_neighbors = n_neighbors
+        self.n_eigs = n_eigs
+        self.cache_dir = cache_dir
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+
+        self.matrices = None  # Stack of the K matrices (K x N x N)
+        self.delta = np.zeros((0, 0))
+        self._factors = None
+        self._keys = [hashlib.sha1(method.encode()).hexdigest()]  # Content hash of every prefix of the matrices
+
+        self.V = None
+        self.d = None
+        self.similarity = None
+        self.epsilon = None
+        self._degree = None
+
+    def _cache_file(self, key):
+        return os.path.join(self.cache_dir, f"eigen_map_distance_{key}.npz")
+
+    def _load_cached(self, k):
+        """
+        Distance matrix of the first k matrices from the chain of cached column blocks, or None if incomplete.
+        """
+        delta = np.zeros((k, k))
+        end, key = k, self._keys[k]
+        while end > 0:
+            if not os.path.exists(self._cache_file(key)):
+                return None
+            with np.load(self._cache_file(key)) as cached:
+                start, columns, key = int(cached['start']), cached['columns'], str(cached['parent'])
+            delta[:end, start:end] = columns
+            delta[start:end, :start] = columns[:start].T
+            end = start
+        return delta
+
+    def append(self, C):
+        """
+        Add matrices and compute their distances to all the matrices added before.
+
+        Args:
+            C (np.ndarray): Tensor of shape (N, N, M) with M positive definite matrices.
+
+        Returns:
+            IncrementalEigenmap: self.
+        """
+        Ck = np.ascontiguousarray(np.moveaxis(np.asarray(C, dtype=np.float64), 2, 0))
+        K = 0 if self.matrices is None else len(self.matrices)
+        self.matrices = Ck if self.matrices is None else np.concatenate([self.matrices, Ck])
+        if self.method == 'CHOLESKY':
+            factors = _whitening_factors(Ck)
+            self._factors = factors if self._factors is None else np.concatenate([self._factors, factors])
+
+        for matrix in Ck:
+            self._keys.append(hashlib.sha1(self._keys[-1].encode() + matrix.tobytes()).hexdigest())
+        K_new = len(self.matrices)
+
+        # ✅ Longest prefix of the matrices with cached distances
+        start = K
+        delta = np.zeros((K_new, K_new))
+        delta[:K, :K] = self.delta
+        if self.cache_dir is not None:
+            for k in range(K_new, K, -1):
+                cached = self._load_cached(k)
+                if cached is not None:
+                    start = k
+                    delta[:k, :k] = cached
+                    break
+
+        # ✅ New columns of the upper triangle, mirrored into the new rows
+        tile = _tile_distances(self.matrices, self._factors, 0, K_new, start, K_new)
+        delta[:, start:] = tile
+        delta[start:, :start] = tile[:start].T
+        delta[start:, start:] += tile[start:].T
+        self.delta = delta
+
+        # ✅ New columns only, linked to the prefix they extend
+        if self.cache_dir is not None and start < K_new:
+            np.savez(self._cache_file(self._keys[-1]), start=start, parent=self._keys[start], columns=delta[:, start:])
+
+        return self
+
+    def embed(self):
+        """
+        Laplacian eigen-map of all the matrices added so far; see laplacian_eigenmap().
+
+        Returns:
+            V (np.ndarray): Eigenvectors of the Laplacian eigen-map.
+            d (np.ndarray): Eigenvalues of the Laplacian eigen-map.
+            delta (np.ndarray): Eigen-map distance matrix.
+            similarity (np.ndarray or scipy.sparse.csr_matrix): Similarity matrix.
+            epsilon (float): kappa times the median of delta.
+        """
+        self.V, self.d, self.similarity, self.epsilon = _eigenmap(self.delta, self.kappa, self.n_neighbors,
+                                                                  self.n_eigs)
+        self._degree = np.asarray(self.similarity.sum(axis=1)).ravel()
+        return self.V, self.d, self.delta, self.similarity, self.epsilon
+
+    def transform(self, C):
+        """
+        Nystrom out-of-sample embedding of new matrices into the last eigen-map, without adding them.
+
+        The new matrices' similarities to the embedded matrices are normalized with the degrees as in the
+        eigen-map, and projected on the eigenvectors: v(x) = sum_i L(x, i) V_i / d. With the dense similarity,
+        a matrix that was embedded gets back its row of V. With n_neighbors, the similarities of a new matrix
+        are kept for its n_neighbors nearest embedded matrices.
+
+        Args:
+            C (np.ndarray): Tensor of shape (N, N, M) with M positive definite matrices.
+
+        Returns:
+            np.ndarray: Embedding of the new matrices (M x number of eigenpairs).
+        """
+        if self.V is None:
+            raise ValueError("embed() must be called before transform().")
+
+        K = len(self._degree)  # Matrices in the last eigen-map
+        Ck = np.ascontiguousarray(np.moveaxis(np.asarray(C, dtype=np.float64), 2, 0))
+        matrices = np.concatenate([self.matrices[:K], Ck])
+        factors = None
+        if self.method == 'CHOLESKY':
+            factors = np.concatenate([self._factors[:K], _whitening_factors(Ck)])
+
+        # ✅ Distances of the new matrices to the embedded ones (M x K)
+        distances = _tile_distances(matrices, factors, 0, K, K, len(matrices)).T
+        similarity = np.exp(-distances / self.epsilon)
+        if self.n_neighbors is not None:
+            far = np.argpartition(distances, min(self.n_neighbors, K) - 1, axis=1)[:, min(self.n_neighbors, K):]
+            np.put_along_axis(similarity, far, 0, axis=1)
+
+        # ✅ Degree-normalized similarities projected on the eigenvectors
+        degree = np.sum(similarity, axis=1)
+        L = similarity / np.sqrt(degree[:, np.newaxis] * self._degree[np.newaxis, :])
+        return (L @ self.V) / self.d
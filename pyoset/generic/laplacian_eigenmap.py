@@ -1,45 +1,164 @@
 import numpy as np
-from scipy.linalg import eig
+import scipy.sparse as sp
+from scipy.sparse.linalg import eigsh
+from pyoset.generic.eigen_map_distance import _knn_distances, eigen_map_distance
 
-def laplacian_eigenmap(C, kappa):
+
+def _knn_graph(indices, values, K):
     """
-    Laplacian eigen-map of positive semi-definite matrix pairs.
+    Symmetric sparse matrix on a k-NN graph: an edge is kept if either node is among the other's neighbours.
 
     Args:
-        C (np.ndarray): Tensor of shape (N, N, K) with K semi-positive definite matrices.
-        kappa (float): Median factor for distance normalization.
+        indices (np.ndarray): Nearest neighbours of each node (K x k).
+        values (np.ndarray): Non-negative, symmetric edge values of the nearest neighbours (K x k).
+        K (int): Number of nodes.
+
+    Returns:
+        scipy.sparse.csr_matrix: Symmetric (K x K) matrix with the edge values.
+    """
+    rows = np.repeat(np.arange(K), indices.shape[1])
+    graph = sp.csr_matrix((values.ravel(), (rows, indices.ravel())), shape=(K, K))
+    return graph.maximum(graph.T).tocsr()
+
+
+def _dense_knn(delta, n_neighbors, block_size=1024):
+    """
+    Nearest neighbours of each node from a dense distance matrix, a block of rows at a time.
+
+    Returns:
+        indices (np.ndarray): Nearest neighbours of each node, itself included (K x k).
+        distances (np.ndarray): Distances to the nearest neighbours (K x k).
+    """
+    K = delta.shape[0]
+    k = min(n_neighbors + 1, K)  # The node itself is at distance zero
+
+    indices = np.empty((K, k), dtype=np.intp)
+    for start in range(0, K, block_size):
+        rows = delta[start:start + block_size]
+        indices[start:start + block_size] = np.argpartition(rows, k - 1, axis=1)[:, :k]
+    return indices, np.take_along_axis(delta, indices, axis=1)
+
+
+def _spectrum(similarity, n_eigs=None):
+    """
+    Largest eigenpairs of the similarity matrix normalized with its degree vector, in descending order.
 
     Returns:
         V (np.ndarray): Eigenvectors of the Laplacian eigen-map.
         d (np.ndarray): Eigenvalues of the Laplacian eigen-map.
-        delta (np.ndarray): Eigen-map distance matrix.
-        similarity (np.ndarray): Similarity matrix.
-        epsilon (float): kappa times the median of delta.
     """
-    K = C.shape[2]
-    delta = np.zeros((K, K))
+    K = similarity.shape[0]
 
-    # ✅ Pairwise eigen-map distance calculation
-    for i in range(K - 1):
-        for j in range(i + 1, K):
-            lambdas = eig(C[:, :, i], C[:, :, j])[0]
-            delta[i, j] = np.sum(np.log(np.abs(lambdas))**2)
-            delta[j, i] = delta[i, j]  # Symmetric matrix
+    # ✅ Symmetric normalization with the degree vector
+    s = 1 / np.sqrt(np.asarray(similarity.sum(axis=1)).ravel())
+    if sp.issparse(similarity):
+        L = similarity.multiply(s[:, np.newaxis]).multiply(s[np.newaxis, :]).tocsr()
+    else:
+        L = similarity * s[:, np.newaxis] * s[np.newaxis, :]
+
+    # ✅ Largest eigenpairs of the symmetric matrix
+    if n_eigs is None or n_eigs >= K - 1:
+        eig_vals, eig_vecs = np.linalg.eigh(L.toarray() if sp.issparse(L) else L)
+    else:
+        eig_vals, eig_vecs = eigsh(L, k=n_eigs, which='LA')
+
+    # ✅ Sort eigenvalues in descending order
+    idx = np.argsort(-eig_vals)[:n_eigs]
+    return eig_vecs[:, idx], eig_vals[idx]
+
+
+def _eigenmap(delta, kappa, n_neighbors=None, n_eigs=None):
+    """
+    Laplacian eigen-map of a given eigen-map distance matrix; see laplacian_eigenmap().
+
+    Returns:
+        V (np.ndarray): Eigenvectors of the Laplacian eigen-map.
+        d (np.ndarray): Eigenvalues of the Laplacian eigen-map.
+        similarity (np.ndarray or scipy.sparse.csr_matrix): Similarity matrix.
+        epsilon (float): kappa times the median of delta.
+    """
+    K = delta.shape[0]
 
     # ✅ Epsilon and similarity matrix
     mask = np.triu(np.ones((K, K), dtype=bool), 1)
     dd = delta[mask]
     epsilon = kappa * np.median(dd)
-    similarity = np.exp(-delta / epsilon)
 
-    # ✅ Laplacian eigen-map calculation
-    S = np.diag(1 / np.sqrt(np.sum(similarity, axis=1)))
-    L = S @ similarity @ S
-    eig_vals, eig_vecs = np.linalg.eig(L)
+    if n_neighbors is None and n_eigs is None:
+        similarity = np.exp(-delta / epsilon)
 
-    # ✅ Sort eigenvalues in descending order
-    idx = np.argsort(-eig_vals)
-    d = eig_vals[idx]
-    V = eig_vecs[:, idx]
+        # ✅ Laplacian eigen-map calculation
+        S = np.diag(1 / np.sqrt(np.sum(similarity, axis=1)))
+        L = S @ similarity @ S
+        eig_vals, eig_vecs = np.linalg.eig(L)
+
+        # ✅ Sort eigenvalues in descending order
+        idx = np.argsort(-eig_vals)
+        d = eig_vals[idx]
+        V = eig_vecs[:, idx]
+
+        return V, d, similarity, epsilon
+
+    if n_neighbors is None:
+        similarity = np.exp(-delta / epsilon)
+    else:
+        indices, distances = _dense_knn(delta, n_neighbors)
+        similarity = _knn_graph(indices, np.exp(-distances / epsilon), K)
+
+    V, d = _spectrum(similarity, n_eigs)
+    return V, d, similarity, epsilon
+
+
+def laplacian_eigenmap(C, kappa, method='EIG', workers=1, n_neighbors=None, n_eigs=None, metric='RIEMANNIAN',
+                       block_size=1024):
+    """
+    Laplacian eigen-map of positive semi-definite matrix pairs.
+
+    By default the dense similarity matrix is used and all eigenpairs are computed. With n_neighbors, only the
+    n_neighbors nearest neighbours of each node are kept in a sparse similarity graph; with n_eigs, only the
+    n_eigs largest eigenpairs are computed with a sparse symmetric eigensolver (eigsh). In both cases the
+    normalized matrix is formed by scaling with the degree vector and the eigenpairs are real.
+
+    With n_neighbors, no (K x K) array is formed: the distances are computed in tiles of block_size rows and
+    columns, keeping only the nearest neighbours of each node and a quantile sketch of all distances for the
+    median, so the memory is O(K n_neighbors). The median is exact up to 4096 pairs, and beyond that within
+    about 0.25 % of the pairs in rank with probability 0.99. Combine it with n_eigs for hundreds of thousands
+    of matrices.
+
+    Args:
+        C (np.ndarray): Tensor of shape (N, N, K) with K semi-positive definite matrices.
+        kappa (float): Median factor for distance normalization.
+        method (str): Pairwise distance solver, 'EIG' (default) or 'CHOLESKY' (batched Cholesky-whitened
+            symmetric eigensolvers, for positive definite matrices); see eigen_map_distance().
+        workers (int, optional): Number of processes computing the distance matrix; 1 (default) computes in this
+            process and None uses all CPUs.
+        n_neighbors (int, optional): Number of nearest neighbours per node in a sparse similarity graph.
+        n_eigs (int, optional): Number of largest eigenpairs to compute.
+        metric (str): 'RIEMANNIAN' (exact eigen-map distance, default) or 'LOG_EUCLIDEAN' (one matrix
+            logarithm per matrix, a faster approximation for screening); see eigen_map_distance().
+        block_size (int): Rows and columns per distance tile with n_neighbors (default: 1024).
+
+    Returns:
+        V (np.ndarray): Eigenvectors of the Laplacian eigen-map.
+        d (np.ndarray): Eigenvalues of the Laplacian eigen-map.
+        delta (np.ndarray or scipy.sparse.csr_matrix): Eigen-map distance matrix; with n_neighbors, the sparse
+            matrix of the distances on the k-NN graph.
+        similarity (np.ndarray or scipy.sparse.csr_matrix): Similarity matrix, sparse if n_neighbors is given.
+        epsilon (float): kappa times the median of delta.
+    """
+    if n_neighbors is not None:
+        # ✅ Nearest-neighbour distances, tile by tile
+        indices, distances, median = _knn_distances(C, n_neighbors, method, workers, metric, block_size)
+        K = len(indices)
+        epsilon = kappa * median
+        delta = _knn_graph(indices, distances, K)
+        similarity = _knn_graph(indices, np.exp(-distances / epsilon), K)
+        V, d = _spectrum(similarity, n_eigs)
+        return V, d, delta, similarity, epsilon
+
+    # ✅ Pairwise eigen-map distance calculation
+    delta = eigen_map_distance(C, method, workers, metric)
+
+    V, d, similarity, epsilon = _eigenmap(delta, kappa, n_neighbors, n_eigs)
 
-    return V, d, delta, similarity, epsilon
\ No newline at end of file
+    return V, d, delta, similarity, epsilon
@@ -0,0 +1,313 @@
+from math import gcd
+
+import numpy as np
+
+# Samples of the signal (over all channels) processed at a time by rolling_moments()
+_ROLLING_ELEMENTS = 1 << 20
+
+# Largest estimated relative rounding error of a window's moments from the cumulative sums in rolling_moments()
+_ROLLING_TOL = 1e-9
+
+# Standard deviation, in units of eps * |mean|, at or below which a channel is constant up to rounding
+_CONSTANT_TOL = 4
+
+
+class Moments:
+    """
+    Mergeable single-pass central moments of multichannel data.
+
+    The count, mean and sums of the 2nd, 3rd and (optionally) 4th powers of the deviations from the mean are
+    kept per channel. Blocks of samples are added with update(), each reduced with its own mean so that no raw
+    power sums are formed, and combined with the pairwise update formulas of Chan et al., Terriberry and Pebay.
+    Accumulators of different chunks, records or processes are combined with merge(); the result does not
+    depend on how the samples were split, up to rounding.
+
+    Args:
+        num_channels (int): Number of channels.
+        order (int): Highest moment to keep, 2 (variance), 3 (skewness, default) or 4 (kurtosis).
+        block_size (int): Number of samples reduced at a time in update(), which bounds the temporaries
+            (default: 65536).
+    """
+
+    def __init__(self, num_channels, order=3, block_size=65536):
+        if order not in [2, 3, 4]:
+            raise ValueError("Invalid order. Use 2, 3 or 4.")
+
+        self.order = order
+        self.block_size = block_size
+        self.count = 0
+        self.mean = np.zeros(num_channels)
+        self.m2 = np.zeros(num_channels)
+        self.m3 = np.zeros(num_channels) if order >= 3 else None
+        self.m4 = np.zeros(num_channels) if order >= 4 else None
+
+    def update(self, x):
+        """
+        Add samples.
+
+        Args:
+            x (np.ndarray): Samples (num_channels x n).
+
+        Returns:
+            Moments: self.
+        """
+        x = np.asarray(x, dtype=float)
+        for start in range(0, x.shape[1], self.block_size):
+            block = x[:, start:start + self.block_size]
+
+            # ✅ Central moments of the block about its own mean
+            other = Moments(len(self.mean), self.order)
+            other.count = block.shape[1]
+            other.mean = np.mean(block, axis=1)
+            d = block - other.mean[:, np.newaxis]
+            d2 = d * d
+            other.m2 = np.sum(d2, axis=1)
+            if self.order >= 3:
+                other.m3 = np.einsum('ij,ij->i', d2, d)
+            if self.order >= 4:
+                other.m4 = np.einsum('ij,ij->i', d2, d2)
+            self.merge(other)
+        return self
+
+    def merge(self, other):
+        """
+        Add the samples of another accumulator.
+
+        Args:
+            other (Moments): Accumulator of the same channels and at least the same order.
+
+        Returns:
+            Moments: self.
+        """
+        n_a, n_b = self.count, other.count
+        if n_b == 0:
+            return self
+        if n_a == 0:
+            self.count = n_b
+            self.mean = other.mean.copy()
+            self.m2 = other.m2.copy()
+            self.m3 = None if self.order < 3 else other.m3.copy()
+            self.m4 = None if self.order < 4 else other.m4.copy()
+            return self
+
+        n = n_a + n_b
+        delta = other.mean - self.mean
+        delta_n = delta / n
+
+        # ✅ Higher moments first, from the lower moments before their update
+        if self.order >= 4:
+            self.m4 = (self.m4 + other.m4 + delta * delta_n**3 * n_a * n_b * (n_a * n_a - n_a * n_b + n_b * n_b)
+                       + 6 * delta_n**2 * (n_a * n_a * other.m2 + n_b * n_b * self.m2)
+                       + 4 * delta_n * (n_a * other.m3 - n_b * self.m3))
+        if self.order >= 3:
+            self.m3 = (self.m3 + other.m3 + delta * delta_n**2 * n_a * n_b * (n_a - n_b)
+                       + 3 * delta_n * (n_a * other.m2 - n_b * self.m2))
+        self.m2 = self.m2 + other.m2 + delta * delta_n * n_a * n_b
+        self.mean = self.mean + delta_n * n_b
+        self.count = n
+        return self
+
+    def variance(self, ddof=0):
+        """
+        Variance of each channel.
+        """
+        return self.m2 / (self.count - ddof)
+
+    def std(self, ddof=0):
+        """
+        Standard deviation of each channel.
+        """
+        return np.sqrt(self.variance(ddof))
+
+    def constant(self):
+        """
+        Channels that are constant up to rounding: the deviations from the mean are within the rounding error
+        of the mean, a few eps * |mean| (as the zero-variance check of scipy.stats.skew).
+        """
+        return self.m2 <= self.count * (_CONSTANT_TOL * np.finfo(float).eps * self.mean)**2
+
+    def skewness(self):
+        """
+        Skewness of each channel (population estimate, as MATLAB's skewness and scipy.stats.skew); NaN for
+        constant channels.
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(self.constant(), np.nan, np.sqrt(self.count) * self.m3 / self.m2**1.5)
+
+    def kurtosis(self, fisher=True):
+        """
+        Kurtosis of each channel (population estimate), excess kurtosis if fisher is True (as
+        scipy.stats.kurtosis); NaN for constant channels.
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            kurt = np.where(self.constant(), np.nan, self.count * self.m4 / self.m2**2)
+        return kurt - 3 if fisher else kurt
+
+
+def moments(x, order=3, block_size=65536):
+    """
+    Central moments of each channel of x in a single pass; see Moments.
+
+    Args:
+        x (np.ndarray): Input data (channels x time).
+        order (int): Highest moment to keep, 2, 3 (default) or 4.
+        block_size (int): Number of samples reduced at a time (default: 65536).
+
+    Returns:
+        Moments: Accumulator with the count, mean and central moment sums of x.
+    """
+    x = np.atleast_2d(x)
+    return Moments(x.shape[0], order, block_size).update(x)
+
+
+def _block_rolling_moments(xb, wlen, hop, g, num_windows):
+    """
+    Rolling moments of the windows of a stack of blocks, from cumulative power sums over segments of length g.
+
+    The rounding error of the cumulative sums up to the end of a window grows with their magnitude, so it is
+    estimated per window, from the cumulative sums of d^2 and |d|^3 there (with the sqrt(n) growth of
+    rounding over n segments), relative to the window's own central moments.
+
+    Args:
+        xb (np.ndarray): Blocks of the signal (B x channels x L), each starting at its first window.
+        wlen (int): Window length, a multiple of g.
+        hop (int): Window step, a multiple of g.
+        g (int): Segment length.
+        num_windows (int): Number of windows per block.
+
+    Returns:
+        skw, m, sd (np.ndarray): Skewness, mean and standard deviation of the windows (B x channels x
+            num_windows).
+        unstable (np.ndarray): Windows whose estimated relative error exceeds _ROLLING_TOL, or whose variance
+            is not positive (B x channels x num_windows).
+    """
+    # ✅ Cumulative power sums over segments of the re-centered blocks
+    m_block = np.mean(xb, axis=2, keepdims=True)
+    d = (xb - m_block).reshape(xb.shape[:2] + (-1, g))
+    d2 = d * d
+    sums = np.zeros((4,) + d.shape[:2] + (d.shape[2] + 1,))
+    np.cumsum(np.sum(d, axis=3), axis=2, out=sums[0, ..., 1:])
+    np.cumsum(np.sum(d2, axis=3), axis=2, out=sums[1, ..., 1:])
+    np.cumsum(np.einsum('...k,...k->...', d2, d), axis=2, out=sums[2, ..., 1:])
+    np.cumsum(np.einsum('...k,...k->...', d2, np.abs(d)), axis=2, out=sums[3, ..., 1:])
+
+    # ✅ Window power sums and central moments
+    first = np.arange(num_windows) * (hop // g)
+    last = first + wlen // g
+    s1, s2, s3 = sums[:3, ..., last] - sums[:3, ..., first]
+    a = s1 / wlen
+    m2 = s2 - s1 * a
+    m3 = s3 - 3 * a * s2 + 2 * wlen * a**3
+
+    # ✅ Rounding error estimates of m2 and m3 from the cumulative sums at the window end
+    rounding = np.finfo(float).eps * np.sqrt(d.shape[2])
+    error2 = rounding * sums[1][..., last]
+    error3 = rounding * sums[3][..., last] + 3 * np.abs(a) * error2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        m2 = np.maximum(m2, 0)
+        unstable = (m2 <= 0) | (error2 > _ROLLING_TOL * m2) | (error3 > _ROLLING_TOL * m2**1.5)
+        skw = np.sqrt(wlen) * m3 / m2**1.5
+    return skw, m_block + a, np.sqrt(m2 / wlen), unstable
+
+
+def _direct_window_moments(x, channels, starts, wlen):
+    """
+    Skewness, mean and standard deviation of single windows, two-pass; constant windows get zero skewness.
+
+    Args:
+        x (np.ndarray): Input data (channels x time).
+        channels (np.ndarray): Channel of each window.
+        starts (np.ndarray): First sample of each window.
+        wlen (int): Window length.
+
+    Returns:
+        skw, m, sd (np.ndarray): Skewness, mean and standard deviation of each window.
+    """
+    windows = x[channels[:, np.newaxis], starts[:, np.newaxis] + np.arange(wlen)]
+    m = np.mean(windows, axis=1)
+    d = windows - m[:, np.newaxis]
+    d2 = d * d
+    m2 = np.sum(d2, axis=1)
+    m3 = np.einsum('ij,ij->i', d2, d)
+
+    constant = np.ptp(windows, axis=1) == 0
+    m2 = np.where(constant, 0, m2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        skw = np.where(constant, 0, np.sqrt(wlen) * m3 / m2**1.5)
+    return skw, m, np.sqrt(m2 / wlen)
+
+
+def rolling_moments(x, wlen, hop=1, block_size=None):
+    """
+    Skewness, mean and standard deviation of each channel over sliding windows, in O(T) time.
+
+    Window sums of the first three powers are differences of cumulative sums. The rounding error of these power
+    sums grows with the distance of a window's mean from the mean they are taken about, relative to the
+    window's standard deviation (cubed, for the skewness), so the windows are processed in short blocks, each
+    re-centered on its own mean, and the cumulative sums run over segments of g = gcd(wlen, hop) samples (each
+    summed pairwise) instead of single samples. Many blocks are computed at a time from a strided view of the
+    signal.
+
+    The rounding error of every window is estimated from the magnitude of the cumulative sums at its end.
+    Windows where it may exceed about 1e-9 of the window's own variance or skewness scale, e.g. quiet windows
+    after a much larger stretch of the same block, are recomputed directly in two passes, at O(wlen) each.
+    Constant windows (no sample changes) get zero skewness and standard deviation, as in skew().
+
+    Args:
+        x (np.ndarray): Input data (channels x time).
+        wlen (int): Window length in samples.
+        hop (int): Window step in samples (default: 1).
+        block_size (int, optional): Number of windows per block; by default a block spans about 5 window
+            lengths.
+
+    Returns:
+        skw (np.ndarray): Skewness of each channel and window (channels x K), K = 1 + (T - wlen) // hop.
+        m (np.ndarray): Mean of each channel and window (channels x K).
+        sd (np.ndarray): Population standard deviation of each channel and window (channels x K).
+    """
+    x = np.atleast_2d(np.asarray(x, dtype=float))
+    C, T = x.shape
+    if wlen < 1 or wlen > T or hop < 1:
+        raise ValueError("wlen must be between 1 and the signal length, and hop must be positive.")
+
+    K = 1 + (T - wlen) // hop
+    if block_size is None:
+        block_size = -(-4 * wlen // hop)
+    block_size = min(block_size, K)
+    block_len = (block_size - 1) * hop + wlen
+    g = gcd(wlen, hop)
+    skw, m, sd = np.empty((C, K)), np.empty((C, K)), np.empty((C, K))
+    unstable = np.empty((C, K), dtype=bool)
+
+    # ✅ Full blocks, a bounded number of samples at a time
+    num_blocks = K // block_size
+    blocks = np.lib.stride_tricks.sliding_window_view(x, block_len, axis=1)[:, ::block_size * hop][:, :num_blocks]
+    step = max(1, _ROLLING_ELEMENTS // (C * block_len))
+    for b0 in range(0, num_blocks, step):
+        b1 = min(b0 + step, num_blocks)
+        moments_blocks = _block_rolling_moments(blocks[:, b0:b1].transpose(1, 0, 2), wlen, hop, g, block_size)
+        for out, values in zip([skw, m, sd, unstable], moments_blocks):
+            out[:, b0 * block_size:b1 * block_size] = values.transpose(1, 0, 2).reshape(C, -1)
+
+    # ✅ Remaining windows
+    k0 = num_blocks * block_size
+    if k0 < K:
+        xb = x[np.newaxis, :, k0 * hop:(K - 1) * hop + wlen]
+        for out, values in zip([skw, m, sd, unstable], _block_rolling_moments(xb, wlen, hop, g, K - k0)):
+            out[:, k0:] = values[0]
+
+    # ✅ Constant windows, from the number of sample changes within each window
+    changes = np.zeros((C, T), dtype=np.int64)
+    np.cumsum(x[:, 1:] != x[:, :-1], axis=1, out=changes[:, 1:])
+    first = np.arange(K) * hop
+    constant = unstable & (changes[:, first + wlen - 1] == changes[:, first])
+    skw[constant], m[constant], sd[constant] = 0, x[:, first][constant], 0
+
+    # ✅ Direct two-pass moments of the other windows with too large a rounding error
+    channels, windows = np.nonzero(unstable & ~constant)
+    step = max(1, _ROLLING_ELEMENTS // wlen)
+    for start in range(0, len(channels), step):
+        ch, k = channels[start:start + step], windows[start:start + step]
+        skw[ch, k], m[ch, k], sd[ch, k] = _direct_window_moments(x, ch, k * hop, wlen)
+
+    return skw, m, sd
@@ -1,44 +1,290 @@
 import numpy as np
+from scipy.ndimage import median_filter, rank_filter
 
-def outlier_filter(x_raw, method='MEDIAN', half_wlen=5, percentile=95):
+
+def _window_bounds(T, half_wlen):
+    """
+    Start (inclusive) and end (exclusive) indices of the shrinking sliding window around each sample.
+    """
+    t = np.arange(T)
+    start = np.maximum(0, t - half_wlen)
+    end = np.minimum(T, t + half_wlen + 1)
+    return start, end
+
+
+def _sliding_mean(x, half_wlen):
+    """
+    O(T) running-sum mean over a window of 2 * half_wlen + 1 samples, shrinking at the edges.
+
+    Args:
+        x (np.ndarray): Input signal (num_channels x time).
+        half_wlen (int): Half window length.
+
+    Returns:
+        np.ndarray: Windowed mean of x (num_channels x time).
+    """
+    T = x.shape[1]
+    start, end = _window_bounds(T, half_wlen)
+
+    # ✅ Center each channel before accumulating to keep the running sums small
+    offset = np.mean(x, axis=1, keepdims=True)
+    csum = np.zeros((x.shape[0], T + 1))
+    np.cumsum(x - offset, axis=1, out=csum[:, 1:])
+
+    return (csum[:, end] - csum[:, start]) / (end - start) + offset
+
+
+def _sliding_median(x, half_wlen):
+    """
+    Running median over a window of 2 * half_wlen + 1 samples, shrinking at the edges.
+
+    The interior (full-length windows) uses SciPy's sliding rank filter, one channel at a time; only the
+    2 * half_wlen edge samples with shrunk windows are evaluated explicitly.
+
+    Args:
+        x (np.ndarray): Input signal (num_channels x time).
+        half_wlen (int): Half window length.
+
+    Returns:
+        np.ndarray: Windowed median of x (num_channels x time).
+    """
+    T = x.shape[1]
+    wlen = 2 * half_wlen + 1
+    avg = np.empty(x.shape)
+
+    # ✅ Full windows: t in [half_wlen, T - half_wlen)
+    if T >= wlen:
+        for ch in range(x.shape[0]):
+            avg[ch] = median_filter(x[ch], size=wlen, mode='nearest')
+
+    # ✅ Shrunk windows at both ends
+    start, end = _window_bounds(T, half_wlen)
+    idx = np.arange(T)
+    for t in np.flatnonzero((idx < half_wlen) | (idx >= T - half_wlen)):
+        avg[:, t] = np.median(x[:, start[t]:end[t]], axis=1)
+
+    return avg
+
+
+def _rolling_percentile(x, half_wlen, percentile):
+    """
+    Percentile over a sliding window of 2 * half_wlen + 1 samples, interpolated as np.percentile does.
+
+    Each percentile is computed from one or two sliding order statistics (SciPy's rank filter, O(log w) per
+    sample). Near the edges the window is shifted inside the record instead of shrunk, so every value is a
+    percentile of exactly 2 * half_wlen + 1 samples; records shorter than that use a single global percentile.
+
+    Args:
+        x (np.ndarray): Input signal (num_channels x time).
+        half_wlen (int): Half window length.
+        percentile (float): Percentile in [0, 100].
+
+    Returns:
+        np.ndarray: Rolling percentile of x (num_channels x time).
+    """
+    T = x.shape[1]
+    wlen = 2 * half_wlen + 1
+    if T <= wlen:
+        return np.repeat(np.percentile(x, percentile, axis=1)[:, np.newaxis], T, axis=1)
+
+    # ✅ Order statistics around the virtual index, as np.percentile (linear method)
+    virtual = percentile / 100 * (wlen - 1)
+    lo = int(np.floor(virtual))
+    hi = min(lo + 1, wlen - 1)
+    frac = virtual - lo
+
+    y = np.empty(x.shape)
+    for ch in range(x.shape[0]):
+        a = rank_filter(x[ch], lo, size=wlen, mode='nearest')
+        if frac > 0:
+            b = rank_filter(x[ch], hi, size=wlen, mode='nearest')
+            diff = b - a
+            a = b - diff * (1 - frac) if frac >= 0.5 else a + diff * frac
+        y[ch] = a
+
+    # ✅ Shift the edge windows inside the record
+    y[:, :half_wlen] = y[:, half_wlen:half_wlen + 1]
+    y[:, T - half_wlen:] = y[:, T - half_wlen - 1:T - half_wlen]
+
+    return y
+
+
+def _filter_windowed(x, method, half_wlen, diff_threshold):
+    """
+    Replace the samples of x that deviate from their windowed mean/median by at least diff_threshold, given per
+    channel or per sample.
+    """
+    # Sliding mean or median over all channels and samples
+    if method == 'MEAN':
+        avg = _sliding_mean(x, half_wlen)
+    else:
+        avg = _sliding_median(x, half_wlen)
+
+    # Detect and replace outliers
+    er = np.abs(x - avg)
+    if diff_threshold.ndim == 1:
+        diff_threshold = diff_threshold[:, np.newaxis]
+    replace = er >= diff_threshold
+    return np.where(replace, avg, x)
+
+
+def outlier_filter(x_raw, method='MEDIAN', half_wlen=5, percentile=95, diff_threshold=None, sketch=None,
+                   threshold_half_wlen=None):
     """
     Outlier filter to detect and replace outliers with mean or median of a sliding window.
-    
+
     Args:
         x_raw (np.ndarray): Input signal (num_channels x time).
         method (str): 'MEAN' or 'MEDIAN'.
         half_wlen (int): Half window length for sliding window.
         percentile (float): Percentile threshold for outlier detection.
-        
+        diff_threshold (np.ndarray, optional): Per-channel outlier thresholds. If None (default), the
+            percentile of the absolute first-order difference of each channel is used.
+        sketch (QuantileSketch, optional): Sketch of the absolute first-order differences; if given, the
+            thresholds are its approximate percentiles instead of np.percentile over the whole record.
+        threshold_half_wlen (int, optional): If given, the threshold of each sample is a rolling percentile of
+            the absolute first-order difference over the 2 * threshold_half_wlen + 1 differences around it,
+            instead of one global value per channel. Computed in O(T log w); diff_threshold and sketch are
+            ignored.
+
     Returns:
         np.ndarray: Filtered signal.
     """
     if method not in ['MEAN', 'MEDIAN']:
         raise ValueError("Invalid method. Use 'MEAN' or 'MEDIAN'.")
 
-    # First-order difference along time axis
-    df = np.diff(x_raw, axis=1)
-    diff_threshold = np.percentile(np.abs(df), percentile, axis=1)
+    if threshold_half_wlen is not None:
+        df = np.abs(np.diff(x_raw, axis=1))
+        diff_threshold = _rolling_percentile(df, threshold_half_wlen, percentile)
+        # Sample t uses the window centred on difference t (the last sample reuses the last difference)
+        diff_threshold = np.concatenate((diff_threshold, diff_threshold[:, -1:]), axis=1)
+    elif sketch is not None:
+        diff_threshold = sketch.percentile(percentile)
+    elif diff_threshold is None:
+        # First-order difference along time axis
+        df = np.diff(x_raw, axis=1)
+        diff_threshold = np.percentile(np.abs(df), percentile, axis=1)
+    else:
+        diff_threshold = np.broadcast_to(np.asarray(diff_threshold, dtype=float), (x_raw.shape[0],))
+
+    return _filter_windowed(x_raw, method, half_wlen, diff_threshold)
+
+
+class OutlierFilter:
+    """
+    Streaming outlier filter for unbounded multichannel recordings.
+
+    Chunks of samples are fed through process(); the filter holds back the last half_wlen samples until their
+    look-ahead window is complete, so the output lags the input by a fixed latency of half_wlen samples. Only
+    half_wlen samples of look-behind and half_wlen pending samples are kept between calls. flush() emits the
+    held-back samples at the end of a record.
+
+    With the same thresholds, the concatenated output equals outlier_filter() over the whole record.
+
+    Args:
+        method (str): 'MEAN' or 'MEDIAN'.
+        half_wlen (int): Half window length for sliding window.
+        percentile (float): Percentile threshold for outlier detection.
+        diff_threshold (np.ndarray, optional): Per-channel outlier thresholds. If None (default), they are
+            estimated as in outlier_filter() from the first warmup samples, which are held back until then.
+        sketch (QuantileSketch, optional): If given, the absolute first-order differences of every chunk are
+            added to the sketch and the thresholds follow its running percentiles; diff_threshold is ignored.
+        warmup (int): Number of samples from which the thresholds are estimated when neither diff_threshold
+            nor sketch is given (default: 256, at least 2).
+    """
+
+    def __init__(self, method='MEDIAN', half_wlen=5, percentile=95, diff_threshold=None, sketch=None, warmup=256):
+        if method not in ['MEAN', 'MEDIAN']:
+            raise ValueError("Invalid method. Use 'MEAN' or 'MEDIAN'.")
+        if warmup < 2:
+            raise ValueError("warmup must be at least 2 samples.")
+
+        self.method = method
+        self.half_wlen = half_wlen
+        self.percentile = percentile
+        self.diff_threshold = None if diff_threshold is None else np.asarray(diff_threshold, dtype=float)
+        self.sketch = sketch
+        self.warmup = warmup
+
+        self._buffer = None  # Look-behind samples followed by pending samples
+        self._num_behind = 0  # Number of already emitted samples at the start of the buffer
+        self._last_sample = np.zeros((0 if sketch is None else sketch.num_channels, 0))
+
+    def process(self, chunk):
+        """
+        Filter the next chunk of the stream.
+
+        Args:
+            chunk (np.ndarray): Next input samples (num_channels x chunk_length).
+
+        Returns:
+            np.ndarray: Filtered samples whose look-ahead window is complete (num_channels x n); n may be zero.
+        """
+        chunk = np.asarray(chunk, dtype=float)
+        data = chunk if self._buffer is None else np.concatenate((self._buffer, chunk), axis=1)
+        if self.sketch is not None:
+            # ✅ Differences across the chunk boundary included
+            df = np.diff(np.concatenate((self._last_sample, chunk), axis=1), axis=1)
+            self.sketch.update(np.abs(df))
+            if chunk.shape[1] > 0:
+                self._last_sample = chunk[:, -1:]
+            self.diff_threshold = self.sketch.percentile(self.percentile)
+        elif self.diff_threshold is None:
+            # ✅ Hold back the samples until the thresholds can be estimated from the first warmup samples
+            if data.shape[1] < self.warmup:
+                self._buffer = data
+                return np.zeros((data.shape[0], 0))
+            df = np.diff(data[:, :self.warmup], axis=1)
+            self.diff_threshold = np.percentile(np.abs(df), self.percentile, axis=1)
+        else:
+            self.diff_threshold = np.broadcast_to(self.diff_threshold, (chunk.shape[0],))
+
+        end = max(data.shape[1] - self.half_wlen, self._num_behind)
+
+        # ✅ Filter the samples that have a complete look-ahead window
+        if end > self._num_behind:
+            y = _filter_windowed(data, self.method, self.half_wlen, self.diff_threshold)[:, self._num_behind:end]
+        else:
+            y = np.zeros((data.shape[0], 0))
+
+        # ✅ Keep half_wlen samples of look-behind and the pending samples
+        keep = max(0, end - self.half_wlen)
+        self._buffer = data[:, keep:]
+        self._num_behind = end - keep
+
+        return y
+
+    def flush(self):
+        """
+        Emit the held-back samples at the end of the record, using shrunk windows as outlier_filter() does.
+
+        If the record ends before the thresholds were estimated, they are estimated from all of its samples; a
+        record of a single sample is returned unchanged.
 
-    # Initialize filtered signal
-    x_filtered = np.copy(x_raw)
-    T = x_raw.shape[1]
+        Returns:
+            np.ndarray: The last filtered samples (num_channels x n).
+        """
+        if self._buffer is None:
+            # ✅ Channels of per-channel thresholds or of the sketch; unknown for no or a scalar threshold
+            num_channels = len(self.diff_threshold) if np.ndim(self.diff_threshold) == 1 else self._last_sample.shape[0]
+            return np.zeros((num_channels, 0))
 
-    for t in range(T):
-        # Define the window range
-        start_idx = max(0, t - half_wlen)
-        end_idx = min(T, t + half_wlen + 1)
-        window = x_raw[:, start_idx:end_idx]
+        if self.diff_threshold is None:
+            if self._buffer.shape[1] < 2:
+                y = self._buffer
+                self._buffer = None
+                return y
+            df = np.diff(self._buffer, axis=1)
+            self.diff_threshold = np.percentile(np.abs(df), self.percentile, axis=1)
 
-        # Apply mean or median filtering
-        if method == 'MEAN':
-            avg = np.mean(window, axis=1)
+        if self._buffer.shape[1] > self._num_behind:
+            y = _filter_windowed(self._buffer, self.method, self.half_wlen, self.diff_threshold)
+            y = y[:, self._num_behind:]
         else:
-            avg = np.median(window, axis=1)
+            y = np.zeros((self._buffer.shape[0], 0))
 
-        # Detect and replace outliers
-        er = np.abs(x_raw[:, t] - avg)
-        replace = er >= diff_threshold[:, np.newaxis]
-        x_filtered[replace, t] = avg[replace]
+        self._buffer = None
+        self._num_behind = 0
+        self._last_sample = self._last_sample[:, :0]
 
-    return x_filtered
\ No newline at end of file
+        return y
@@ -1,9 +1,13 @@
 import numpy as np
+from pyoset.generic.moments import moments
 
 def skew(data):
     """
     Calculate the skewness, mean, and standard deviation for each channel in the matrix.
 
+    The moments are accumulated in a single pass about the running mean (see pyoset.generic.moments), which
+    avoids the cancellation of the raw third-moment formula for signals with a large offset.
+
     Args:
         data (np.ndarray): 2D matrix of shape (N channels x T samples).
 
@@ -12,18 +16,12 @@ def skew(data):
         m (np.ndarray): Mean vector of shape (N,).
         sd (np.ndarray): Standard deviation vector of shape (N,).
     """
-    # ✅ Mean along the second dimension (columns)
-    m = np.mean(data, axis=1)
-    
-    # ✅ Standard deviation along the second dimension
-    sd = np.std(data, axis=1, ddof=0)  # MATLAB uses population std by default
+    # ✅ Mean, standard deviation and third central moment in one pass
+    acc = moments(data, order=3)
+    m = acc.mean
+    sd = acc.std(ddof=0)  # MATLAB uses population std by default
 
-    # ✅ Mean of cubed values
-    m3 = np.mean(np.power(data, 3), axis=1)
-    
     # ✅ Skewness calculation (handle zero std cases)
-    with np.errstate(divide='ignore', invalid='ignore'):
-        skw = np.divide((m3 - 3 * m * sd**2 - m**3), (sd**3))
-        skw = np.nan_to_num(skw)  # Replace NaN with 0
+    skw = np.nan_to_num(acc.skewness())  # Constant channels, up to rounding, are NaN; replace with 0
 
-    return skw, m, sd
\ No newline at end of file
+    return skw, m, sd
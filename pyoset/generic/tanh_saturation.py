@@ -1,4 +1,5 @@
 import numpy as np
+from pyoset.generic.moments import moments
 
 def tanh_saturation(x, param, mode='ksigma'):
     """
@@ -19,7 +20,7 @@ def tanh_saturation(x, param, mode='ksigma'):
 
     # Scale factor calculation
     if mode == 'ksigma':
-        alpha = param * np.std(x, axis=1, keepdims=True)
+        alpha = param * moments(x, order=2).std()[:, np.newaxis]
     elif mode == 'absolute':
         if np.isscalar(param):
             alpha = np.full((x.shape[0], 1), param)
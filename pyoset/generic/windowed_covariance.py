@@ -0,0 +1,103 @@
+from math import gcd
+
+import numpy as np
+
+# Shortest segment length for which cumulative outer-product sums beat per-window products
+_MIN_SEGMENT = 16
+
+
+def _cumulative_window_sums(xb, wlen, hop, g, num_windows):
+    """
+    Sums and outer-product sums of overlapping windows from cumulative sums over segments of length g.
+
+    Args:
+        xb (np.ndarray): Block of the signal (N x L), starting at the first window.
+        wlen (int): Window length, a multiple of g.
+        hop (int): Window step, a multiple of g.
+        g (int): Segment length.
+        num_windows (int): Number of windows in the block.
+
+    Returns:
+        np.ndarray: Window sums (num_windows x N).
+        np.ndarray: Window outer-product sums (num_windows x N x N).
+    """
+    N = xb.shape[0]
+    segments = np.ascontiguousarray(xb.reshape(N, -1, g).transpose(1, 0, 2))
+    S1 = np.zeros((len(segments) + 1, N))
+    S2 = np.zeros((len(segments) + 1, N, N))
+    np.cumsum(np.sum(segments, axis=2), axis=0, out=S1[1:])
+    np.cumsum(segments @ segments.transpose(0, 2, 1), axis=0, out=S2[1:])
+
+    # ✅ Window sums from the cumulative sums at the window boundaries
+    first = np.arange(num_windows) * (hop // g)
+    last = first + wlen // g
+    return S1[last] - S1[first], S2[last] - S2[first]
+
+
+def windowed_covariance(x, wlen, hop=None, shrinkage=0.0, block_size=1024, out=None):
+    """
+    Covariance matrices of sliding (optionally overlapping) windows of a multichannel signal.
+
+    For overlapping windows, every window start and end is a multiple of g = gcd(wlen, hop), so the record is
+    cut into segments of length g whose sums and outer-product sums are computed with batched matrix products.
+    The window sums are differences of their cumulative sums, and each sample enters the outer products once.
+    Non-overlapping windows, or segments too short for this to pay off, are computed from a strided view of
+    the windows with one batched matrix product.
+
+    Windows are processed in blocks, each re-centered on its own mean, so the temporary memory does not grow
+    with the record length and the results can be written straight into a preallocated or memory-mapped
+    tensor (e.g. np.lib.format.open_memmap).
+
+    Args:
+        x (np.ndarray): Input signal (N channels x T samples).
+        wlen (int): Window length in samples.
+        hop (int, optional): Window step in samples; defaults to wlen (non-overlapping windows).
+        shrinkage (float): Shrinkage gamma towards a scaled identity, C = (1 - gamma) C + gamma tr(C) / N I,
+            which keeps the matrices positive definite (default: 0, no shrinkage).
+        block_size (int): Number of windows computed at a time (default: 1024).
+        out (np.ndarray, optional): Output tensor of shape (N, N, K).
+
+    Returns:
+        np.ndarray: Tensor of shape (N, N, K) with the unbiased covariance matrices of the K = 1 + (T - wlen) // hop
+        windows, as accepted by laplacian_eigenmap().
+    """
+    x = np.atleast_2d(np.asarray(x, dtype=float))
+    N, T = x.shape
+    if hop is None:
+        hop = wlen
+    if wlen < 2 or wlen > T or hop < 1:
+        raise ValueError("wlen must be between 2 and the signal length, and hop must be positive.")
+    if not 0 <= shrinkage <= 1:
+        raise ValueError("shrinkage must be between 0 and 1.")
+
+    K = 1 + (T - wlen) // hop
+    if out is None:
+        out = np.empty((N, N, K))
+    elif out.shape != (N, N, K):
+        raise ValueError(f"out must have shape ({N}, {N}, {K}).")
+
+    g = gcd(wlen, hop)
+    for k0 in range(0, K, block_size):
+        k1 = min(k0 + block_size, K)
+        start = k0 * hop
+        end = (k1 - 1) * hop + wlen
+        xb = x[:, start:end] - np.mean(x[:, start:end], axis=1, keepdims=True)
+
+        if hop >= wlen or g < _MIN_SEGMENT:
+            # ✅ Strided view of the windows (K x N x wlen)
+            windows = np.lib.stride_tricks.sliding_window_view(xb, wlen, axis=1)[:, ::hop].transpose(1, 0, 2)
+            s1 = np.sum(windows, axis=2)
+            C = windows @ windows.transpose(0, 2, 1)
+        else:
+            s1, C = _cumulative_window_sums(xb, wlen, hop, g, k1 - k0)
+        C -= s1[:, :, np.newaxis] * s1[:, np.newaxis, :] / wlen
+        C /= wlen - 1
+
+        if shrinkage > 0:
+            trace = np.einsum('kii->k', C) / N
+            C *= 1 - shrinkage
+            C[:, np.arange(N), np.arange(N)] += shrinkage * trace[:, np.newaxis]
+
+        out[:, :, k0:k1] = np.moveaxis(C, 0, 2)
+
+    return out
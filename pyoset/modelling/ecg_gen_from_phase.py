@@ -1,15 +1,22 @@
 import numpy as np
+from pyoset.modelling.gmm_kernel import gmm_kernel
+from pyoset.modelling.gmm_template import gmm_template_eval
 
-def ecg_gen_from_phase(params, phase):
+def ecg_gen_from_phase(params, phase, max_error=None):
     """
     Synthetic ECG generator using a Gaussian Mixture Model.
 
     Args:
-        params (dict or list): ECG model parameters (alpha, b, theta) either as a dict or list.
-        phase (np.ndarray): Cardiac phase signal.
+        params (dict or list): ECG model parameters (alpha, b, theta) either as a dict or list. Several
+            parameter sets are evaluated in one pass with (P x K) arrays in the dict, or a (P x 3K) array.
+        phase (np.ndarray): Cardiac phase signal, of any shape.
+        max_error (float, optional): If given, the model is interpolated from a cached phase template with at
+            most this absolute error, instead of being evaluated at every sample, where the template is smaller
+            than the signal (see gmm_template_eval).
 
     Returns:
-        np.ndarray: Synthetic ECG time-series.
+        np.ndarray: Synthetic ECG time-series of the shape and (floating) dtype of phase, or (P,) + phase.shape
+        for P parameter sets.
     """
     if isinstance(params, dict):
         alpha = np.array(params['alpha'])
@@ -17,20 +24,21 @@ def ecg_gen_from_phase(params, phase):
         theta = np.array(params['theta'])
     else:
         # Vector case: Extract parameters
-        L = len(params) // 3
-        alpha = np.array(params[:L])
-        b = np.array(params[L:2 * L])
-        theta = np.array(params[2 * L:])
-
-    # Initialize the ECG signal
-    x = np.zeros_like(phase)
+        params = np.array(params)
+        L = params.shape[-1] // 3
+        alpha = params[..., :L]
+        b = params[..., L:2 * L]
+        theta = params[..., 2 * L:]
 
     # Generate the ECG signal using Gaussian mixture model
-    for j in range(len(alpha)):
-        # Phase difference with wrapping
-        dtheta = (phase - theta[j] + np.pi) % (2 * np.pi) - np.pi
+    if max_error is not None:
+        x = gmm_template_eval(phase, alpha, b, theta, max_error)
+    else:
+        x = gmm_kernel(phase, alpha, b, theta)
 
-        # Gaussian kernel contribution
-        x += alpha[j] * np.exp(-dtheta**2 / (2 * b[j]**2))
+    # Single parameter sets keep the dtype of a floating-point phase
+    phase_dtype = np.asarray(phase).dtype
+    if x.ndim == np.ndim(phase) and np.issubdtype(phase_dtype, np.floating):
+        x = x.astype(phase_dtype, copy=False)
 
-    return x
\ No newline at end of file
+    return x
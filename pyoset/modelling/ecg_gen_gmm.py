@@ -1,29 +1,40 @@
 import numpy as np
+from pyoset.modelling.gmm_kernel import gmm_kernel
+from pyoset.modelling.gmm_template import gmm_template_eval
 
-def ecg_gen_gmm(phi, theta0, alpha, b, theta):
+def ecg_gen_gmm(phi, theta0, alpha, b, theta, block_size=8192, dtype=None, out=None, max_error=None):
     """
     Generate synthetic ECG using a Gaussian Mixture Model.
 
     Args:
         phi (np.ndarray): ECG phase signal derived from real ECG.
         theta0 (float): Desired phase shift.
-        alpha (np.ndarray): Amplitudes of Gaussian kernels.
-        b (np.ndarray): Widths (standard deviations) of the Gaussian kernels.
-        theta (np.ndarray): Centers of the Gaussian kernels.
+        alpha (np.ndarray): Amplitudes of Gaussian kernels, (K,) or (P x K) for P parameter sets.
+        b (np.ndarray): Widths (standard deviations) of the Gaussian kernels, (K,) or (P x K).
+        theta (np.ndarray): Centers of the Gaussian kernels, (K,) or (P x K).
+        block_size (int): Number of (sample, parameter set) pairs evaluated at a time; bounds the temporary
+            memory to O(block_size x K) (default: 8192).
+        dtype (np.dtype, optional): Computation dtype of the ECG, e.g. np.float32 (default: float64).
+        out (np.ndarray, optional): Output buffer for the synthetic ECG.
+        max_error (float, optional): If given, the model is interpolated from a cached phase template with at
+            most this absolute error, instead of being evaluated at every sample.
 
     Returns:
-        np.ndarray: Synthetic ECG signal.
+        np.ndarray: Synthetic ECG signal, (P x N) for P parameter sets.
         np.ndarray: Shifted ECG phase.
     """
-    N = len(phi)
-
     # ✅ Shift and wrap ECG phase
     phi = (phi + theta0 + np.pi) % (2 * np.pi) - np.pi
 
-    # ✅ Phase differences for Gaussian kernels
-    dtetai = (np.tile(phi, (len(theta), 1)).T - np.tile(theta, (N, 1)) + np.pi) % (2 * np.pi) - np.pi
-
-    # ✅ Generate synthetic ECG signal using GMM
-    ecg = np.sum(np.tile(alpha, (N, 1)) * np.exp(-dtetai**2 / (2 * np.tile(b, (N, 1))**2)), axis=1)
+    # ✅ Generate synthetic ECG signal using GMM, block by block or from a template
+    if max_error is not None:
+        ecg = gmm_template_eval(phi, alpha, b, theta, max_error)
+        if out is not None:
+            out[...] = ecg
+            ecg = out
+        elif dtype is not None:
+            ecg = ecg.astype(dtype)
+    else:
+        ecg = gmm_kernel(phi, alpha, b, theta, block_size=block_size, dtype=dtype, out=out)
 
-    return ecg, phi
\ No newline at end of file
+    return ecg, phi
@@ -1,6 +1,126 @@
 import numpy as np
+from pyoset.modelling.gmm_template import gmm_template_eval
 
-def ecg_gen_stochastic(N, fs, f, f_deviations, alpha, delta_alpha, b, delta_b, theta, delta_theta, theta0):
+
+def _gmm(phi, alpha, b, theta, max_error=None, num_samples=None):
+    """
+    Gaussian mixture ECG model G(phi) = sum(alpha * exp(-dtheta^2 / (2 b^2))) for a vector of phases, evaluated
+    directly or, if max_error is given, interpolated from a cached phase template serving num_samples samples.
+    """
+    if max_error is not None:
+        return gmm_template_eval(phi, alpha, b, theta, max_error, num_samples)
+    dtetai = (phi[:, np.newaxis] - theta + np.pi) % (2 * np.pi) - np.pi
+    return np.sum(alpha * np.exp(-dtetai**2 / (2 * b**2)), axis=1)
+
+
+def _ecg_gen_chunks(N, fs, f, f_deviations, alpha, delta_alpha, b, delta_b, theta, delta_theta, theta0, chunk_size,
+                    method, rand, max_error):
+    """
+    Generate the stochastic ECG model chunk by chunk, carrying the phase, ECG value, angular frequency and
+    beat-wise parameters of the last generated sample across chunks.
+
+    'loop' Euler-integrates sample by sample. The beat-wise methods find the beat boundaries from the phase
+    updates (accumulated exactly as the sample loop does) and evaluate all samples of a beat at once, either
+    Euler-integrated with a cumulative sum ('integrated') or as the Gaussian mixture ('closed_form').
+    """
+    # ✅ Initialize parameters
+    w = 2 * np.pi * f   # Angular frequency
+    dt = 1 / fs         # Time step
+    if method != 'closed_form' or np.any(np.asarray([delta_alpha, delta_b, delta_theta]) != 0):
+        max_error = None  # A template pays off only if all beats share the same mixture
+    num_samples = np.inf if N is None else N  # Samples served by the template over all chunks
+
+    d_alpha = np.copy(alpha)
+    d_theta = np.copy(theta)
+    d_b = np.copy(b)
+    n_gmm = len(alpha)
+
+    # State of the last generated sample
+    phi_i = theta0
+    ecg_i = _gmm(np.array([theta0]), d_alpha, d_b, d_theta, max_error, num_samples)[0] if N is None or N > 1 else 0.0
+    offset = 0.0  # Closed form: constant of integration of the current beat
+
+    generated = 0
+    while N is None or generated < N:
+        n = chunk_size if N is None else min(chunk_size, N - generated)
+        phi = np.zeros(n)    # Phase vector
+        ecg = np.zeros(n)    # ECG signal
+
+        k = 0
+        if generated == 0:
+            phi[0] = phi_i
+            ecg[0] = ecg_i
+            k = 1
+
+        if method == 'loop':
+            for k in range(k, n):
+                dtetai = (phi_i - d_theta + np.pi) % (2 * np.pi) - np.pi
+                ecg_i = ecg_i - dt * np.sum(w * d_alpha / (d_b**2) * dtetai * np.exp(-dtetai**2 / (2 * d_b**2)))
+
+                # ✅ Phase update
+                phi_i = phi_i + w * dt
+
+                # ✅ Beat transition with stochastic deviations
+                if phi_i > np.pi:
+                    phi_i -= 2 * np.pi
+                    d_alpha = alpha * (1 + (rand(n_gmm) - 0.5) * delta_alpha)
+                    d_theta = theta * (1 + (rand(n_gmm) - 0.5) * delta_theta)
+                    d_b = b * np.maximum(0, (1 + (rand(n_gmm) - 0.5) * delta_b))
+                    w = 2 * np.pi * f * np.maximum(0, (1 + (rand() - 0.5) * f_deviations))
+
+                phi[k] = phi_i
+                ecg[k] = ecg_i
+
+        else:
+            while k < n:
+                # ✅ Phase of the next samples, accumulated exactly as the sample loop does
+                step = w * dt
+                m = n - k
+                if step > 0:
+                    m = min(m, max(1, int(np.ceil((np.pi - phi_i) / step)) + 2))
+                seg = np.full(m + 1, step)
+                seg[0] = phi_i
+                seg = np.cumsum(seg)
+
+                crossing = np.flatnonzero(seg[1:] > np.pi)
+                if crossing.size > 0:
+                    m = crossing[0] + 1
+                phi[k:k + m] = seg[1:m + 1]
+
+                # ✅ ECG of the next m samples with the parameters of the current beat
+                if method == 'integrated':
+                    dtetai = (seg[:m, np.newaxis] - d_theta + np.pi) % (2 * np.pi) - np.pi
+                    increments = np.empty(m + 1)
+                    increments[0] = ecg_i
+                    increments[1:] = -(dt * np.sum(w * d_alpha / (d_b**2) * dtetai * np.exp(-dtetai**2 / (2 * d_b**2)),
+                                                   axis=1))
+                    ecg[k:k + m] = np.cumsum(increments)[1:]
+                else:
+                    ecg[k:k + m] = _gmm(phi[k:k + m], d_alpha, d_b, d_theta, max_error, num_samples) + offset
+
+                k += m
+
+                # ✅ Beat transition with stochastic deviations
+                if crossing.size > 0:
+                    phi[k - 1] -= 2 * np.pi
+                    g_old = _gmm(phi[k - 1:k], d_alpha, d_b, d_theta, max_error, num_samples)[0]
+                    d_alpha = alpha * (1 + (rand(n_gmm) - 0.5) * delta_alpha)
+                    d_theta = theta * (1 + (rand(n_gmm) - 0.5) * delta_theta)
+                    d_b = b * np.maximum(0, (1 + (rand(n_gmm) - 0.5) * delta_b))
+                    w = 2 * np.pi * f * np.maximum(0, (1 + (rand() - 0.5) * f_deviations))
+
+                    # Keep the closed-form solution continuous across the parameter switch
+                    offset += g_old - _gmm(phi[k - 1:k], d_alpha, d_b, d_theta, max_error, num_samples)[0]
+
+                phi_i = phi[k - 1]
+                ecg_i = ecg[k - 1]
+
+        generated += n
+        yield ecg, phi
+
+
+def ecg_gen_stochastic(N, fs, f, f_deviations, alpha, delta_alpha, b, delta_b, theta, delta_theta, theta0,
+                       method='loop', rng=None, max_error=None):
     """
     Generate synthetic ECG with beat-wise stochastic deviations.
 
@@ -16,41 +136,75 @@ def ecg_gen_stochastic(N, fs, f, f_deviations, alpha, delta_alpha, b, delta_b, t
         theta (np.ndarray): Phases of the Gaussian kernels.
         delta_theta (float): Percentage phase deviation.
         theta0 (float): Initial phase of the ECG.
+        method (str): Generation method (default: 'loop').
+            - 'loop': sample-by-sample Euler integration, as in the MATLAB implementation.
+            - 'integrated': beat-wise vectorized Euler integration; equal to 'loop' up to rounding.
+            - 'closed_form': beat-wise vectorized evaluation of the Gaussian mixture, i.e. the exact solution
+              of the differential equation integrated by 'loop', kept continuous across beats.
+        rng (np.random.Generator, optional): Random generator of the beat-wise deviations. If None (default), the
+            global np.random state is used.
+        max_error (float, optional): 'closed_form' only. If given, and delta_alpha, delta_b and delta_theta are
+            all zero so that every beat shares the same mixture, the mixture is interpolated from a cached phase
+            template with at most this absolute error per evaluation. Sample n then deviates from the direct
+            evaluation by at most (2 n_beats + 1) * max_error. With beat-wise parameter deviations each beat
+            would need its own template, so the mixture is evaluated directly and max_error is ignored.
 
     Returns:
         np.ndarray: Synthetic ECG signal.
         np.ndarray: Shifted ECG phase.
+
+    Notes:
+        All methods draw the same random numbers in the same order, so with the same random state they share
+        the phase signal and the beat-wise parameters, and 'integrated' reproduces 'loop' up to rounding.
+        'loop' is the left Riemann (Euler) sum of the solution given by 'closed_form'. By the Euler-Maclaurin
+        formula, for kernel widths b well below pi (kernels negligible at the beat boundaries):
+
+            |ecg_loop[n] - ecg_closed_form[n]| <= h / 2 * exp(-1/2) * sum(|alpha| / b)
+                                                  + n_beats * 0.32 * h^2 * sum(|alpha| / b^2)
+
+        where h = w dt is the phase step, n_beats is the number of beats completed before sample n, and the
+        largest beat-wise values of w, |alpha| and 1 / b are used. The first term bounds the error within a beat,
+        the second its accumulation across beats.
     """
-    # ✅ Initialize parameters
-    w = 2 * np.pi * f   # Angular frequency
-    dt = 1 / fs         # Time step
+    if method not in ['loop', 'integrated', 'closed_form']:
+        raise ValueError("Invalid method. Use 'loop', 'integrated' or 'closed_form'.")
 
-    phi = np.zeros(N)    # Phase vector
-    ecg = np.zeros(N)    # ECG signal
+    rand = np.random.rand if rng is None else rng.random
+
+    if N == 0:
+        return np.zeros(0), np.zeros(0)
+
+    return next(_ecg_gen_chunks(N, fs, f, f_deviations, alpha, delta_alpha, b, delta_b, theta, delta_theta, theta0,
+                                N, method, rand, max_error))
 
-    phi[0] = theta0
-    d_alpha = np.copy(alpha)
-    d_theta = np.copy(theta)
-    d_b = np.copy(b)
-    n_gmm = len(alpha)
 
-    for i in range(N - 1):
-        dtetai = (phi[i] - d_theta + np.pi) % (2 * np.pi) - np.pi
+def ecg_gen_stochastic_chunks(N, fs, f, f_deviations, alpha, delta_alpha, b, delta_b, theta, delta_theta, theta0,
+                              chunk_size=65536, method='loop', rng=None, max_error=None):
+    """
+    Generate synthetic ECG with beat-wise stochastic deviations in fixed-size chunks.
 
-        if i == 0:
-            ecg[i] = np.sum(d_alpha * np.exp(-dtetai**2 / (2 * d_b**2)))
+    The phase, ECG value, angular frequency and beat-wise parameters are carried across chunk boundaries, so
+    the concatenated chunks equal the output of ecg_gen_stochastic() with the same arguments and random state,
+    while memory stays bounded by the chunk size.
 
-        ecg[i + 1] = ecg[i] - dt * np.sum(w * d_alpha / (d_b**2) * dtetai * np.exp(-dtetai**2 / (2 * d_b**2)))
+    Args:
+        N (int or None): Signal length (number of samples); None generates an unbounded stream.
+        fs, f, f_deviations, alpha, delta_alpha, b, delta_b, theta, delta_theta, theta0: As in ecg_gen_stochastic().
+        chunk_size (int): Number of samples per chunk; the last chunk may be shorter (default: 65536).
+        method (str): 'loop', 'integrated' or 'closed_form', as in ecg_gen_stochastic().
+        rng (np.random.Generator, optional): Random generator of the beat-wise deviations. If None (default), the
+            global np.random state is used.
+        max_error (float, optional): Template interpolation error for 'closed_form', as in ecg_gen_stochastic().
 
-        # ✅ Phase update
-        phi[i + 1] = phi[i] + w * dt
+    Yields:
+        tuple: (ecg, phi) chunks of the synthetic ECG signal and its phase.
+    """
+    if method not in ['loop', 'integrated', 'closed_form']:
+        raise ValueError("Invalid method. Use 'loop', 'integrated' or 'closed_form'.")
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be a positive integer.")
 
-        # ✅ Beat transition with stochastic deviations
-        if phi[i + 1] > np.pi:
-            phi[i + 1] -= 2 * np.pi
-            d_alpha = alpha * (1 + (np.random.rand(n_gmm) - 0.5) * delta_alpha)
-            d_theta = theta * (1 + (np.random.rand(n_gmm) - 0.5) * delta_theta)
-            d_b = b * np.maximum(0, (1 + (np.random.rand(n_gmm) - 0.5) * delta_b))
-            w = 2 * np.pi * f * np.maximum(0, (1 + (np.random.rand() - 0.5) * f_deviations))
+    rand = np.random.rand if rng is None else rng.random
 
-    return ecg, phi
\ No newline at end of file
+    yield from _ecg_gen_chunks(N, fs, f, f_deviations, alpha, delta_alpha, b, delta_b, theta, delta_theta, theta0,
+                               chunk_size, method, rand, max_error)
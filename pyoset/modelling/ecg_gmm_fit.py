@@ -0,0 +1,110 @@
+import numpy as np
+
+
+def _gmm_model(phase, alpha, b, theta):
+    """
+    Gaussian mixture model of P beats and its analytic Jacobian with respect to (alpha, b, theta).
+
+    Args:
+        phase (np.ndarray): Phase of each beat (P x N).
+        alpha, b, theta (np.ndarray): Kernel parameters (P x K).
+
+    Returns:
+        np.ndarray: Model output (P x N).
+        np.ndarray: Jacobian (P x N x 3K), columns ordered as [alpha, b, theta].
+    """
+    K = alpha.shape[1]
+    dtheta = phase[:, :, np.newaxis] - theta[:, np.newaxis, :]
+    dtheta -= 2 * np.pi * np.rint(dtheta / (2 * np.pi))  # Wrap to [-pi, pi]
+    inv_b2 = 1 / b[:, np.newaxis, :]**2
+
+    jac = np.empty(dtheta.shape[:2] + (3 * K,))
+    kernels = jac[:, :, :K]
+    np.exp(-0.5 * inv_b2 * dtheta**2, out=kernels)
+
+    # ✅ d/d_alpha = E, d/d_theta = alpha E dtheta / b^2, d/d_b = alpha E dtheta^2 / b^3
+    np.multiply(alpha[:, np.newaxis, :] * kernels, dtheta * inv_b2, out=jac[:, :, 2 * K:])
+    np.multiply(jac[:, :, 2 * K:], dtheta / b[:, np.newaxis, :], out=jac[:, :, K:2 * K])
+
+    return np.matmul(kernels, alpha[:, :, np.newaxis])[:, :, 0], jac
+
+
+def ecg_gmm_fit(x, phase, params0, max_iter=200, tol=1e-10):
+    """
+    Fit Gaussian mixture ECG model parameters (alpha, b, theta) to one or many beats.
+
+    Levenberg-Marquardt least squares with the analytic Jacobian of the Gaussian kernels with respect to all
+    3K parameters. Many beats (or leads) are fitted at once: the Jacobians, normal equations and damping
+    updates of all fits are evaluated together as stacked arrays.
+
+    Args:
+        x (np.ndarray): Beat(s) to fit, (N,) or (P x N).
+        phase (np.ndarray): Cardiac phase of the samples, (N,) shared by all beats or (P x N).
+        params0 (dict or list): Initial parameters (alpha, b, theta) as in ecg_gen_from_phase(), either a
+            dict of (K,) or (P x K) arrays or a (3K,) or (P x 3K) vector.
+        max_iter (int): Maximum number of iterations (default: 200).
+        tol (float): Relative decrease of the residual sum of squares below which a fit stops (default: 1e-10).
+
+    Returns:
+        params (dict): Fitted 'alpha', 'b' and 'theta', (K,) for a single beat or (P x K).
+        cost (np.ndarray or float): Residual sum of squares of each fit.
+    """
+    x = np.asarray(x, dtype=float)
+    single = x.ndim == 1
+    x = np.atleast_2d(x)
+    P, N = x.shape
+    phase = np.broadcast_to(np.asarray(phase, dtype=float), (P, N))
+
+    if isinstance(params0, dict):
+        p = np.hstack([np.broadcast_to(np.atleast_2d(np.asarray(params0[k], dtype=float)), (P, np.shape(params0[k])[-1]))
+                       for k in ['alpha', 'b', 'theta']])
+    else:
+        params0 = np.atleast_2d(np.asarray(params0, dtype=float))
+        p = np.array(np.broadcast_to(params0, (P, params0.shape[-1])))
+    K = p.shape[1] // 3
+
+    def evaluate(p, rows):
+        model, jac = _gmm_model(phase[rows], p[:, :K], p[:, K:2 * K], p[:, 2 * K:])
+        r = x[rows] - model
+        return r, jac, np.sum(r**2, axis=1)
+
+    r, jac, cost = evaluate(p, np.arange(P))
+    lam = np.full(P, 0.1)
+    nu = np.full(P, 2.0)
+    active = np.arange(P)
+
+    for _ in range(max_iter):
+        # ✅ Damped normal equations of all active fits (Marquardt scaling)
+        jac_t = np.transpose(jac[active], (0, 2, 1))
+        jtj = np.matmul(jac_t, jac[active])
+        jtr = np.matmul(jac_t, r[active, :, np.newaxis])[:, :, 0]
+        diag = np.einsum('pkk->pk', jtj) + 1e-12
+        damping = lam[active, np.newaxis] * diag
+        step = np.linalg.solve(jtj + damping[:, :, np.newaxis] * np.eye(3 * K), jtr[:, :, np.newaxis])[:, :, 0]
+        r_new, jac_new, cost_new = evaluate(p[active] + step, active)
+
+        # ✅ Gain ratio of the actual to the predicted decrease (Nielsen's damping update)
+        predicted = np.sum(step * (damping * step + jtr), axis=1)
+        gain = (cost[active] - cost_new) / np.maximum(predicted, np.finfo(float).tiny)
+        improved = gain > 0
+        converged = improved & (cost[active] - cost_new <= tol * cost[active])
+
+        rows = active[improved]
+        p[rows] += step[improved]
+        r[rows] = r_new[improved]
+        jac[rows] = jac_new[improved]
+        cost[rows] = cost_new[improved]
+        lam[rows] *= np.maximum(1 / 3, 1 - (2 * gain[improved] - 1)**3)
+        nu[rows] = 2.0
+        rows = active[~improved]
+        lam[rows] *= nu[rows]
+        nu[rows] *= 2
+
+        active = active[~converged & (lam[active] < 1e16)]
+        if len(active) == 0:
+            break
+
+    params = {'alpha': p[:, :K], 'b': np.abs(p[:, K:2 * K]), 'theta': (p[:, 2 * K:] + np.pi) % (2 * np.pi) - np.pi}
+    if single:
+        return {k: v[0] for k, v in params.items()}, cost[0]
+    return params, cost
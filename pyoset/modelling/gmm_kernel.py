@@ -0,0 +1,83 @@
+import numpy as np
+
+
+def gmm_kernel(phase, alpha, b, theta, block_size=8192, dtype=None, out=None):
+    """
+    Memory-bounded evaluation of the Gaussian mixture ECG model sum(alpha * exp(-dtheta^2 / (2 b^2))).
+
+    The wrapped phase differences are evaluated with broadcasting over blocks of samples, in place, so the peak
+    temporary memory is O(block_size x K) regardless of the signal length. In float64 the result is bitwise
+    equal to evaluating the full (N x K) matrix at once.
+
+    Several parameter sets can be evaluated in one pass by giving (P x K) parameter arrays. The wrapped phase
+    differences are computed once per distinct row of theta and shared by all parameter sets with that theta.
+
+    Args:
+        phase (np.ndarray): Cardiac phase signal of N samples, of any shape.
+        alpha (np.ndarray): Amplitudes of the K Gaussian kernels, (K,) or (P x K).
+        b (np.ndarray): Widths (standard deviations) of the Gaussian kernels, (K,) or (P x K).
+        theta (np.ndarray): Centers of the Gaussian kernels, (K,) or (P x K).
+        block_size (int): Number of (sample, parameter set) pairs evaluated at a time (default: 8192).
+        dtype (np.dtype, optional): Computation dtype, e.g. np.float32; defaults to out.dtype or float64.
+        out (np.ndarray, optional): Output buffer of the shape of phase, or (P,) + phase.shape; a non-contiguous
+            buffer is filled through a contiguous copy.
+
+    Returns:
+        np.ndarray: Synthetic ECG time-series, of the shape of phase for a single parameter set or
+        (P,) + phase.shape.
+    """
+    if dtype is None:
+        dtype = np.float64 if out is None else out.dtype
+
+    single = np.ndim(alpha) == 1 and np.ndim(b) == 1 and np.ndim(theta) == 1
+    phase = np.asarray(phase)
+    shape = phase.shape
+    phase = phase.astype(dtype, copy=False).ravel()
+    alpha, b, theta = np.broadcast_arrays(np.atleast_2d(np.asarray(alpha).astype(dtype, copy=False)),
+                                          np.atleast_2d(np.asarray(b).astype(dtype, copy=False)),
+                                          np.atleast_2d(np.asarray(theta).astype(dtype, copy=False)))
+    two_b2 = 2 * b**2
+
+    N = len(phase)
+    P, K = alpha.shape
+    if out is None:
+        out = np.empty(shape if single else (P,) + shape, dtype=dtype)
+    elif out.shape != (shape if single else (P,) + shape):
+        raise ValueError("out must have the shape of phase for one parameter set, or (P,) + phase.shape for P "
+                         "parameter sets.")
+    # ✅ Contiguous buffer for a strided out, copied back at the end
+    result = out if out.flags.c_contiguous else np.empty(out.shape, dtype=out.dtype)
+    out2d = result.reshape(P, N)
+
+    # ✅ Parameter sets sharing the same kernel centers
+    centers, group = np.unique(theta, axis=0, return_inverse=True)
+    group = group.ravel()
+
+    for g in range(len(centers)):
+        rows = np.flatnonzero(group == g)
+        step = max(1, block_size // len(rows))
+        d = np.empty((min(step, N), K), dtype=dtype)
+        e = np.empty((len(rows), min(step, N), K), dtype=dtype)
+
+        for start in range(0, N, step):
+            end = min(start + step, N)
+            dg = d[:end - start]
+            eg = e[:, :end - start]
+
+            # ✅ Wrapped squared phase differences, once per group
+            np.subtract(phase[start:end, np.newaxis], centers[g], out=dg)
+            dg += np.pi
+            np.mod(dg, 2 * np.pi, out=dg)
+            dg -= np.pi
+            np.square(dg, out=dg)
+
+            # ✅ Gaussian kernels of every parameter set in the group
+            np.divide(dg, two_b2[rows, np.newaxis, :], out=eg)
+            np.negative(eg, out=eg)
+            np.exp(eg, out=eg)
+            eg *= alpha[rows, np.newaxis, :]
+            out2d[rows, start:end] = np.sum(eg, axis=2)
+
+    if result is not out:
+        out[...] = result
+    return out
@@ -0,0 +1,156 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from pyoset.modelling.gmm_kernel import gmm_kernel
+
+# LRU cache of phase templates, keyed by parameter hash and grid size, bounded by the bytes of its templates
+_TEMPLATE_CACHE = OrderedDict()
+_TEMPLATE_CACHE_BYTES = 128 << 20
+_TEMPLATE_CACHE_NBYTES = 0
+_TEMPLATE_CACHE_LOCK = threading.Lock()
+
+# Largest template grid; finer templates are not worth their memory, and the mixture is evaluated directly
+_TEMPLATE_MAX_POINTS = 1 << 20
+
+
+def template_grid_size(alpha, b, max_error):
+    """
+    Number of phase grid points for which linear interpolation of the Gaussian mixture is within max_error.
+
+    Between grid points of spacing h, linear interpolation deviates from G by at most h^2 / 8 * max|G''|, with
+    max|G''| <= sum(|alpha| / b^2). The wrapped kernels have a kink at theta +/- pi, where the slope jumps by
+    2 |alpha| pi / b^2 * exp(-pi^2 / (2 b^2)); a kink inside a grid interval adds at most h / 4 times the jump.
+
+    Args:
+        alpha (np.ndarray): Amplitudes of the Gaussian kernels.
+        b (np.ndarray): Widths of the Gaussian kernels.
+        max_error (float): Maximum absolute interpolation error.
+
+    Returns:
+        int: Number of grid points over one period.
+    """
+    alpha = np.abs(np.asarray(alpha, dtype=float))
+    b = np.asarray(b, dtype=float)
+    curvature = np.sum(alpha / b**2) / 8
+    kink = np.sum(2 * alpha * np.pi / b**2 * np.exp(-np.pi**2 / (2 * b**2))) / 4
+
+    # ✅ Largest h with curvature * h^2 + kink * h <= max_error
+    h = 2 * max_error / (kink + np.sqrt(kink**2 + 4 * curvature * max_error))
+    return max(4, int(np.ceil(2 * np.pi / h)))
+
+
+def _build_template(alpha, b, theta, grid_size):
+    """
+    Gaussian mixture tabulated on a uniform phase grid of grid_size intervals over [-pi, pi], read-only.
+    """
+    grid = np.linspace(-np.pi, np.pi, grid_size + 1)
+    values = gmm_kernel(grid, alpha, b, theta)
+    values[-1] = values[0]
+    grid.flags.writeable = False
+    values.flags.writeable = False
+    return grid, values
+
+
+def _interpolate(phase, values):
+    """
+    Periodic linear interpolation of a template on a uniform phase grid.
+    """
+    grid_size = len(values) - 1
+    pos = np.mod((phase + np.pi) * (grid_size / (2 * np.pi)), grid_size)
+    idx = np.minimum(pos.astype(np.intp), grid_size - 1)
+    frac = pos - idx
+    lower = values[idx]
+    return lower + frac * (values[idx + 1] - lower)
+
+
+def gmm_template(alpha, b, theta, max_error=1e-6):
+    """
+    Gaussian mixture ECG model tabulated over one period of phase, from an LRU cache bounded by the bytes of its
+    templates (_TEMPLATE_CACHE_BYTES).
+
+    The cache is shared by all threads and guarded by a lock; cached templates are read-only. A template larger
+    than the whole cache is returned without being cached.
+
+    Args:
+        alpha (np.ndarray): Amplitudes of the Gaussian kernels.
+        b (np.ndarray): Widths of the Gaussian kernels.
+        theta (np.ndarray): Centers of the Gaussian kernels.
+        max_error (float): Maximum absolute error of linear interpolation in the template (default: 1e-6).
+
+    Returns:
+        grid (np.ndarray): Uniform phase grid over [-pi, pi], both ends included.
+        values (np.ndarray): Model values on the grid; the first and last values are equal.
+    """
+    global _TEMPLATE_CACHE_NBYTES
+
+    params = np.ascontiguousarray(np.concatenate([np.ravel(alpha), np.ravel(b), np.ravel(theta)]), dtype=float)
+    grid_size = template_grid_size(alpha, b, max_error)
+    key = (hashlib.sha1(params.tobytes()).hexdigest(), grid_size)
+
+    with _TEMPLATE_CACHE_LOCK:
+        if key in _TEMPLATE_CACHE:
+            _TEMPLATE_CACHE.move_to_end(key)
+            return _TEMPLATE_CACHE[key]
+
+    template = _build_template(alpha, b, theta, grid_size)
+    nbytes = template[0].nbytes + template[1].nbytes
+    if nbytes > _TEMPLATE_CACHE_BYTES:
+        return template
+
+    # ✅ Another thread may have added the same template meanwhile; keep the first one
+    with _TEMPLATE_CACHE_LOCK:
+        if key not in _TEMPLATE_CACHE:
+            _TEMPLATE_CACHE[key] = template
+            _TEMPLATE_CACHE_NBYTES += nbytes
+        template = _TEMPLATE_CACHE[key]
+        _TEMPLATE_CACHE.move_to_end(key)
+        while _TEMPLATE_CACHE_NBYTES > _TEMPLATE_CACHE_BYTES:
+            _, (grid, values) = _TEMPLATE_CACHE.popitem(last=False)
+            _TEMPLATE_CACHE_NBYTES -= grid.nbytes + values.nbytes
+
+    return template
+
+
+def gmm_template_eval(phase, alpha, b, theta, max_error=1e-6, num_samples=None):
+    """
+    Evaluate the Gaussian mixture ECG model by periodic linear interpolation of a phase template.
+
+    The result is within max_error of the direct evaluation (gmm_kernel) for every sample. A template only pays
+    off if it has fewer grid points than the samples it serves, and at most _TEMPLATE_MAX_POINTS; otherwise the
+    mixture is evaluated directly with gmm_kernel. A single parameter set uses the shared template cache (see
+    gmm_template()). Templates of several parameter sets, e.g. of a parameter sweep, are built for this call
+    only, so the sweep does not evict the cached templates.
+
+    Args:
+        phase (np.ndarray): Cardiac phase signal of length N.
+        alpha (np.ndarray): Amplitudes of the K Gaussian kernels, (K,) or (P x K).
+        b (np.ndarray): Widths of the Gaussian kernels, (K,) or (P x K).
+        theta (np.ndarray): Centers of the Gaussian kernels, (K,) or (P x K).
+        max_error (float): Maximum absolute error (default: 1e-6).
+        num_samples (int, optional): Number of samples the template of a single parameter set serves, over
+            this and later calls (e.g. a record generated in segments); defaults to N.
+
+    Returns:
+        np.ndarray: Synthetic ECG time-series, (N,) for a single parameter set or (P x N).
+    """
+    phase = np.asarray(phase, dtype=float)
+    if num_samples is None:
+        num_samples = phase.size
+    if np.ndim(alpha) == 1 and np.ndim(b) == 1 and np.ndim(theta) == 1:
+        if template_grid_size(alpha, b, max_error) > min(num_samples, _TEMPLATE_MAX_POINTS):
+            return gmm_kernel(phase, alpha, b, theta)
+        _, values = gmm_template(alpha, b, theta, max_error)
+        return _interpolate(phase, values)
+
+    alpha, b, theta = np.broadcast_arrays(np.atleast_2d(alpha), np.atleast_2d(b), np.atleast_2d(theta))
+    x = np.empty((len(alpha),) + phase.shape)
+    for p in range(len(alpha)):
+        grid_size = template_grid_size(alpha[p], b[p], max_error)
+        if grid_size > min(phase.size, _TEMPLATE_MAX_POINTS):
+            gmm_kernel(phase, alpha[p], b[p], theta[p], out=x[p])
+        else:
+            x[p] = _interpolate(phase, _build_template(alpha[p], b[p], theta[p], grid_size)[1])
+    return x
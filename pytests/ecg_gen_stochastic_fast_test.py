@@ -0,0 +1,70 @@
+import unittest
+import numpy as np
+from pyoset.modelling.ecg_gen_stochastic import ecg_gen_stochastic as py_ecg, ecg_gen_stochastic_chunks
+
+
+class TestECGGenStochasticFast(unittest.TestCase):
+    alpha = np.array([0.1, -0.15, 1.0, -0.2, 0.3])
+    b = np.array([0.1, 0.05, 0.04, 0.05, 0.15])
+    theta = np.array([-1.2, -0.1, 0.0, 0.1, 1.4])
+
+    def test_integrated(self):
+        """Test the beat-wise Euler integration against the sample loop."""
+
+        # ✅ Test cases: (N, fs, f)
+        test_cases = [(1, 500, 1.0), (2, 500, 1.0), (5000, 500, 1.2), (20000, 1000, 1.5), (3000, 100, 2.5)]
+
+        for N, fs, f in test_cases:
+            with self.subTest(N=N, fs=fs, f=f):
+                np.random.seed(3)
+                ecg_loop, phi_loop = py_ecg(N, fs, f, 0.1, self.alpha, 0.1, self.b, 0.1, self.theta, 0.1, 0.3)
+                np.random.seed(3)
+                ecg_int, phi_int = py_ecg(N, fs, f, 0.1, self.alpha, 0.1, self.b, 0.1, self.theta, 0.1, 0.3,
+                                          method='integrated')
+
+                np.testing.assert_array_equal(phi_int, phi_loop, err_msg="Mismatch in phase")
+                np.testing.assert_allclose(ecg_int, ecg_loop, atol=1e-12, rtol=0, err_msg="Mismatch in ECG output")
+
+    def test_closed_form_bound(self):
+        """Test the closed-form evaluation against the documented error bound."""
+        f_deviations = 0.1
+
+        for fs, f in [(250, 1.0), (500, 1.2), (2000, 1.0)]:
+            with self.subTest(fs=fs, f=f):
+                N = 60 * fs
+                np.random.seed(0)
+                ecg_loop, phi_loop = py_ecg(N, fs, f, f_deviations, self.alpha, 0, self.b, 0, self.theta, 0, 0.3)
+                np.random.seed(0)
+                ecg_cf, phi_cf = py_ecg(N, fs, f, f_deviations, self.alpha, 0, self.b, 0, self.theta, 0, 0.3,
+                                        method='closed_form')
+
+                np.testing.assert_array_equal(phi_cf, phi_loop, err_msg="Mismatch in phase")
+
+                # ✅ Bound with the largest phase step
+                h = 2 * np.pi * f * (1 + f_deviations / 2) / fs
+                n_beats = np.concatenate(([0], np.cumsum(np.diff(phi_loop) < 0)))
+                bound = (h / 2 * np.exp(-0.5) * np.sum(np.abs(self.alpha) / self.b)
+                         + n_beats * 0.32 * h**2 * np.sum(np.abs(self.alpha) / self.b**2))
+
+                self.assertTrue(np.all(np.abs(ecg_cf - ecg_loop) <= bound))
+
+    def test_chunks(self):
+        """Test that concatenated chunks reproduce the single-call output."""
+        for method in ['loop', 'integrated', 'closed_form']:
+            for N, chunk_size in [(1, 4), (3000, 1), (3000, 7), (3000, 1000), (3000, 5000)]:
+                with self.subTest(method=method, N=N, chunk_size=chunk_size):
+                    rng = np.random.default_rng(5)
+                    ecg, phi = py_ecg(N, 500, 1.2, 0.1, self.alpha, 0.1, self.b, 0.1, self.theta, 0.1, 0.3,
+                                      method=method, rng=rng)
+
+                    rng = np.random.default_rng(5)
+                    chunks = list(ecg_gen_stochastic_chunks(N, 500, 1.2, 0.1, self.alpha, 0.1, self.b, 0.1, self.theta,
+                                                            0.1, 0.3, chunk_size=chunk_size, method=method, rng=rng))
+
+                    self.assertTrue(all(len(c[0]) <= chunk_size for c in chunks))
+                    np.testing.assert_array_equal(np.concatenate([c[0] for c in chunks]), ecg, err_msg="Mismatch in ECG output")
+                    np.testing.assert_array_equal(np.concatenate([c[1] for c in chunks]), phi, err_msg="Mismatch in phase")
+
+
+if __name__ == '__main__':
+    unittest.main()
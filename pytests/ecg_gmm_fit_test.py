@@ -0,0 +1,48 @@
+import unittest
+import numpy as np
+from pyoset.modelling.ecg_gmm_fit import ecg_gmm_fit
+from pyoset.modelling.ecg_gen_from_phase import ecg_gen_from_phase
+
+
+class TestECGGMMFit(unittest.TestCase):
+    alpha = np.array([0.1, -0.15, 1.0, -0.2, 0.3])
+    b = np.array([0.1, 0.05, 0.04, 0.05, 0.15])
+    theta = np.array([-1.2, -0.1, 0.0, 0.1, 1.4])
+
+    def test_batch_fit(self):
+        """Test that batch fitting recovers the parameters of noiseless beats."""
+        rng = np.random.default_rng(0)
+        P = 30
+        phase = np.linspace(-np.pi, np.pi, 400, endpoint=False)
+
+        # ✅ Beats with perturbed parameters
+        alpha = self.alpha * (1 + 0.1 * rng.uniform(-1, 1, (P, 5)))
+        b = self.b * (1 + 0.1 * rng.uniform(-1, 1, (P, 5)))
+        theta = self.theta + 0.02 * rng.uniform(-1, 1, (P, 5))
+        x = ecg_gen_from_phase({'alpha': alpha, 'b': b, 'theta': theta}, phase)
+
+        params, cost = ecg_gmm_fit(x, phase, {'alpha': self.alpha, 'b': self.b, 'theta': self.theta})
+
+        self.assertEqual(params['alpha'].shape, (P, 5))
+        self.assertLess(np.max(cost), 1e-12)
+        np.testing.assert_allclose(params['alpha'], alpha, atol=1e-6, err_msg="Mismatch in alpha")
+        np.testing.assert_allclose(params['b'], b, atol=1e-6, err_msg="Mismatch in b")
+        np.testing.assert_allclose(params['theta'], theta, atol=1e-6, err_msg="Mismatch in theta")
+
+    def test_single_fit(self):
+        """Test fitting a single noisy beat with a parameter vector."""
+        rng = np.random.default_rng(1)
+        phase = np.linspace(-np.pi, np.pi, 500, endpoint=False)
+        x = ecg_gen_from_phase({'alpha': self.alpha, 'b': self.b, 'theta': self.theta}, phase)
+        noisy = x + 0.01 * rng.standard_normal(len(phase))
+
+        params0 = np.concatenate((self.alpha * 1.1, self.b * 0.9, self.theta + 0.02))
+        params, cost = ecg_gmm_fit(noisy, phase, params0)
+
+        self.assertEqual(params['alpha'].shape, (5,))
+        self.assertAlmostEqual(cost, np.sum((noisy - ecg_gen_from_phase(params, phase))**2))
+        self.assertLess(cost, np.sum((noisy - x)**2))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+import numpy as np
+import scipy.stats as stats
+from pyoset.ecg.ecg_polarity import ECGPolarity, ecg_polarity, lp_filter_zero_phase
+
+
+class TestECGPolarityChunked(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        fs = 500
+        t = np.arange(30000) / fs
+        beats = np.sin(np.pi * 1.1 * t)**40  # Narrow positive peaks
+        self.fs = fs
+        self.ecg = (np.array([1, -1, 0.5, -2])[:, np.newaxis] * beats + 0.5 * np.sin(2 * np.pi * 0.2 * t)
+                    + 0.05 * rng.standard_normal((4, len(t))))
+
+    def test_chunked(self):
+        """Test chunked polarity against the batch result for several chunk sizes."""
+        skw_batch = stats.skew(self.ecg - lp_filter_zero_phase(self.ecg, 3.0, self.fs), axis=1)
+        polarity_batch = ecg_polarity(self.ecg, self.fs)
+        np.testing.assert_array_equal(polarity_batch, [True, False, True, False])
+
+        for chunk_size in [50, 999, 4096, 100000]:
+            with self.subTest(chunk_size=chunk_size):
+                np.testing.assert_array_equal(ecg_polarity(self.ecg, self.fs, chunk_size=chunk_size), polarity_batch)
+
+                estimator = ECGPolarity(self.fs)
+                for start in range(0, self.ecg.shape[1], chunk_size):
+                    estimator.update(self.ecg[:, start:start + chunk_size])
+                _, skw = estimator.polarity()
+                np.testing.assert_allclose(skw, skw_batch, rtol=1e-10, atol=1e-12)
+
+    def test_live(self):
+        """Test the polarity of a live record at intermediate points."""
+        estimator = ECGPolarity(self.fs)
+        for end in range(5000, 30001, 5000):
+            estimator.update(self.ecg[:, end - 5000:end])
+            _, skw = estimator.polarity()
+            x = self.ecg[:, :end]
+            np.testing.assert_allclose(skw, stats.skew(x - lp_filter_zero_phase(x, 3.0, self.fs), axis=1),
+                                       rtol=1e-10, atol=1e-12)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+import numpy as np
+from scipy.linalg import logm
+from pyoset.generic.eigen_map_distance import eigen_map_distance
+from pyoset.generic.laplacian_eigenmap import laplacian_eigenmap as lemap_py
+from pytests.spd_helpers import random_spd
+
+
+class TestEigenMapDistance(unittest.TestCase):
+    def test_cholesky(self):
+        """Test the batched Cholesky-whitened distances against the pairwise generalized eigensolver."""
+        for N, K in [(2, 3), (4, 5), (8, 40)]:
+            with self.subTest(N=N, K=K):
+                C = random_spd(N, K, seed=N)
+                delta_eig = eigen_map_distance(C, 'EIG')
+                delta_chol = eigen_map_distance(C, 'CHOLESKY')
+
+                np.testing.assert_allclose(delta_chol, delta_eig, rtol=1e-9, atol=1e-12, err_msg="Mismatch in delta")
+                np.testing.assert_array_equal(delta_chol, delta_chol.T)
+
+    def test_workers(self):
+        """Test the process-pool distance computation against the serial one."""
+        C = random_spd(3, 17, seed=7)
+        for method in ['EIG', 'CHOLESKY']:
+            with self.subTest(method=method):
+                delta = eigen_map_distance(C, method)
+                delta_pool = eigen_map_distance(C, method, workers=3)
+
+                np.testing.assert_array_equal(delta_pool, delta)
+
+    def test_log_euclidean(self):
+        """Test the log-Euclidean approximation against matrix logarithms and the exact metric."""
+        C = random_spd(4, 10, seed=5)
+        delta = eigen_map_distance(C, metric='LOG_EUCLIDEAN')
+
+        logs = [logm(C[:, :, k]).real for k in range(10)]
+        delta_ref = np.array([[np.sum((logs[i] - logs[j])**2) for j in range(10)] for i in range(10)])
+        np.testing.assert_allclose(delta, delta_ref, rtol=1e-8, atol=1e-10, err_msg="Mismatch in delta")
+
+        # ✅ Exact for commuting matrices
+        Q = np.linalg.qr(np.random.default_rng(0).standard_normal((4, 4)))[0]
+        D = np.random.default_rng(1).uniform(0.1, 10, (4, 10))
+        C_commuting = np.einsum('ij,jk,lj->ilk', Q, D, Q)
+        np.testing.assert_allclose(eigen_map_distance(C_commuting, metric='LOG_EUCLIDEAN'),
+                                   eigen_map_distance(C_commuting), rtol=1e-8, atol=1e-10)
+
+    def test_laplacian_eigenmap(self):
+        """Test laplacian_eigenmap with the Cholesky distance solver."""
+        C = random_spd(4, 12, seed=42)
+        V, d, delta, similarity, epsilon = lemap_py(C, 0.5)
+        V_c, d_c, delta_c, similarity_c, epsilon_c = lemap_py(C, 0.5, method='CHOLESKY')
+
+        np.testing.assert_allclose(delta_c, delta, rtol=1e-9, err_msg="Mismatch in delta")
+        np.testing.assert_allclose(d_c, d, rtol=1e-8, atol=1e-10, err_msg="Mismatch in eigenvalues")
+        self.assertAlmostEqual(epsilon_c, epsilon)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+import numpy as np
+from pyoset.modelling.ecg_gen_gmm import ecg_gen_gmm as py_ecg
+from pyoset.modelling.ecg_gen_from_phase import ecg_gen_from_phase
+from pyoset.modelling.gmm_kernel import gmm_kernel
+
+
+def tiled_gmm(phi, theta0, alpha, b, theta):
+    """Reference full-matrix implementation of ecg_gen_gmm."""
+    N = len(phi)
+    phi = (phi + theta0 + np.pi) % (2 * np.pi) - np.pi
+    dtetai = (np.tile(phi, (len(theta), 1)).T - np.tile(theta, (N, 1)) + np.pi) % (2 * np.pi) - np.pi
+    ecg = np.sum(np.tile(alpha, (N, 1)) * np.exp(-dtetai**2 / (2 * np.tile(b, (N, 1))**2)), axis=1)
+    return ecg, phi
+
+
+class TestGMMKernel(unittest.TestCase):
+    def test_blocked_kernel(self):
+        """Test the blocked broadcasting kernel against the full-matrix evaluation."""
+        rng = np.random.default_rng(0)
+        alpha = rng.standard_normal(5)
+        b = rng.uniform(0.05, 0.3, 5)
+        theta = rng.uniform(-3, 3, 5)
+
+        for N, block_size in [(1, 8), (100, 8), (1000, 7), (1000, 1000), (1000, 4096)]:
+            with self.subTest(N=N, block_size=block_size):
+                phi = rng.uniform(-4, 4, N)
+                ref_ecg, ref_phi = tiled_gmm(phi, 0.2, alpha, b, theta)
+
+                # ✅ float64: bitwise equal
+                py_ecg_signal, py_phi = py_ecg(phi, 0.2, alpha, b, theta, block_size=block_size)
+                np.testing.assert_array_equal(py_ecg_signal, ref_ecg, err_msg="Mismatch in ECG output")
+                np.testing.assert_array_equal(py_phi, ref_phi, err_msg="Mismatch in Phi output")
+
+                # ✅ float32 computation into an output buffer
+                out = np.empty(N, dtype=np.float32)
+                py_ecg_signal, _ = py_ecg(phi, 0.2, alpha, b, theta, block_size=block_size, out=out)
+                self.assertIs(py_ecg_signal, out)
+                np.testing.assert_allclose(out, ref_ecg, atol=1e-5, rtol=0, err_msg="Mismatch in float32 ECG output")
+
+    def test_batched_parameter_sets(self):
+        """Test (P x K) parameter sets against one call per parameter set."""
+        rng = np.random.default_rng(1)
+        P, K, N = 20, 5, 1000
+        theta = rng.uniform(-3, 3, (4, K))[rng.integers(0, 4, P)]  # Shared kernel centers
+        alpha = rng.standard_normal((P, K))
+        b = rng.uniform(0.05, 0.3, (P, K))
+        phi = rng.uniform(-4, 4, N)
+
+        # ✅ ecg_gen_gmm
+        py_ecg_signal, _ = py_ecg(phi, 0.1, alpha, b, theta, block_size=300)
+        ref_ecg = np.array([tiled_gmm(phi, 0.1, alpha[p], b[p], theta[p])[0] for p in range(P)])
+        np.testing.assert_array_equal(py_ecg_signal, ref_ecg, err_msg="Mismatch in batched ECG output")
+
+        # ✅ ecg_gen_from_phase with dict and (P x 3K) parameters
+        ref_x = np.array([ecg_gen_from_phase({'alpha': alpha[p], 'b': b[p], 'theta': theta[p]}, phi) for p in range(P)])
+        np.testing.assert_array_equal(ecg_gen_from_phase({'alpha': alpha, 'b': b, 'theta': theta}, phi), ref_x)
+        np.testing.assert_array_equal(ecg_gen_from_phase(np.hstack((alpha, b, theta)), phi), ref_x)
+
+    def test_phase_shape_and_dtype(self):
+        """Test that ecg_gen_from_phase keeps the shape and floating dtype of the phase."""
+        rng = np.random.default_rng(2)
+        params = {'alpha': rng.standard_normal(9), 'b': rng.uniform(0.05, 0.3, 9), 'theta': rng.uniform(-3, 3, 9)}
+        phase = rng.uniform(-4, 4, (3, 40))
+        ref_x = ecg_gen_from_phase(params, phase.ravel()).reshape(3, 40)
+
+        for max_error in [None, 1e-6]:
+            with self.subTest(max_error=max_error):
+                x = ecg_gen_from_phase(params, phase, max_error=max_error)
+                self.assertEqual(x.shape, (3, 40))
+                np.testing.assert_allclose(x, ref_x, atol=1e-6, rtol=0)
+
+                x32 = ecg_gen_from_phase(params, phase.astype(np.float32), max_error=max_error)
+                self.assertEqual(x32.dtype, np.float32)
+                self.assertEqual(x32.shape, (3, 40))
+                np.testing.assert_allclose(x32, ref_x, atol=1e-5, rtol=0)
+
+        batched = {key: np.vstack((value, value[::-1])) for key, value in params.items()}
+        self.assertEqual(ecg_gen_from_phase(batched, phase).shape, (2, 3, 40))
+
+    def test_strided_out(self):
+        """Test that a transposed out buffer receives the result for a 2-D phase."""
+        phase = np.linspace(-3, 3, 12).reshape(3, 4)
+        alpha, b, theta = np.ones(2), np.full(2, 0.3), np.array([0, 1.])
+        ref_x = gmm_kernel(phase, alpha, b, theta)
+
+        out = np.zeros((4, 3)).T
+        self.assertIs(gmm_kernel(phase, alpha, b, theta, out=out), out)
+        np.testing.assert_array_equal(out, ref_x)
+
+        out = np.zeros((3, 4, 2)).transpose(2, 0, 1)
+        gmm_kernel(phase, np.vstack((alpha, 2 * alpha)), b, theta, out=out)
+        np.testing.assert_array_equal(out, np.array([ref_x, 2 * ref_x]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from pyoset.modelling import gmm_template
+from pyoset.modelling.gmm_kernel import gmm_kernel
+from pyoset.modelling.ecg_gen_from_phase import ecg_gen_from_phase
+from pyoset.modelling.ecg_gen_stochastic import ecg_gen_stochastic
+
+
+class TestGMMTemplate(unittest.TestCase):
+    alpha = np.array([0.1, -0.15, 1.0, -0.2, 0.3])
+    b = np.array([0.1, 0.05, 0.04, 0.05, 0.15])
+    theta = np.array([-1.2, -0.1, 0.0, 0.1, 1.4])
+
+    def test_max_error(self):
+        """Test the template interpolation against direct evaluation."""
+        rng = np.random.default_rng(0)
+        phase = np.concatenate((rng.uniform(-10, 10, 100000), [-np.pi, np.pi, 3 * np.pi, np.nextafter(np.pi, 0)]))
+
+        # ✅ Test cases: (alpha, b, theta)
+        test_cases = [
+            (self.alpha, self.b, self.theta),
+            (np.array([1.0, 0.8, 0.6]), np.array([0.2, 0.3, 0.25]), np.array([0, np.pi / 2, np.pi])),
+            (np.array([1.0, -0.5]), np.array([1.0, 2.0]), np.array([0.0, 3.0])),  # Wide kernels
+        ]
+
+        for alpha, b, theta in test_cases:
+            for max_error in [1e-3, 1e-6]:
+                with self.subTest(b=b, max_error=max_error):
+                    y = ecg_gen_from_phase({'alpha': alpha, 'b': b, 'theta': theta}, phase, max_error=max_error)
+                    self.assertLessEqual(np.max(np.abs(y - gmm_kernel(phase, alpha, b, theta))), max_error)
+
+    def test_lru_cache(self):
+        """Test that templates are reused and the cache stays bounded by bytes."""
+        gmm_template._TEMPLATE_CACHE.clear()
+        gmm_template._TEMPLATE_CACHE_NBYTES = 0
+
+        first = gmm_template.gmm_template(self.alpha, self.b, self.theta, 1e-4)
+        self.assertIs(gmm_template.gmm_template(self.alpha.copy(), self.b.copy(), self.theta.copy(), 1e-4), first)
+        self.assertIsNot(gmm_template.gmm_template(self.alpha, self.b, self.theta, 1e-5), first)
+
+        nbytes = sum(grid.nbytes + values.nbytes for grid, values in gmm_template._TEMPLATE_CACHE.values())
+        cache_bytes = gmm_template._TEMPLATE_CACHE_BYTES
+        gmm_template._TEMPLATE_CACHE_BYTES = 2 * nbytes
+        try:
+            for k in range(20):
+                gmm_template.gmm_template(self.alpha * (1 + k), self.b, self.theta, 1e-4)
+                self.assertLessEqual(gmm_template._TEMPLATE_CACHE_NBYTES, 2 * nbytes)
+            self.assertEqual(gmm_template._TEMPLATE_CACHE_NBYTES,
+                             sum(grid.nbytes + values.nbytes for grid, values in gmm_template._TEMPLATE_CACHE.values()))
+
+            # ✅ Templates larger than the whole cache are not cached
+            gmm_template.gmm_template(self.alpha, self.b, self.theta, 1e-9)
+            self.assertLessEqual(gmm_template._TEMPLATE_CACHE_NBYTES, 2 * nbytes)
+        finally:
+            gmm_template._TEMPLATE_CACHE_BYTES = cache_bytes
+
+    def test_direct_fallback(self):
+        """Test that templates finer than the signal or the grid limit, and sweeps, leave the cache alone."""
+        gmm_template._TEMPLATE_CACHE.clear()
+        gmm_template._TEMPLATE_CACHE_NBYTES = 0
+        phase = np.random.default_rng(1).uniform(-4, 4, 1000)
+
+        # ✅ Grid of about 444M points for a narrow kernel and a tight error
+        self.assertGreater(gmm_template.template_grid_size([1.0], [0.005], 1e-12), gmm_template._TEMPLATE_MAX_POINTS)
+        np.testing.assert_array_equal(gmm_template.gmm_template_eval(phase, [1.0], [0.005], [0.0], 1e-12,
+                                                                     num_samples=10**12),
+                                      gmm_kernel(phase, [1.0], [0.005], [0.0]))
+        np.testing.assert_array_equal(gmm_template.gmm_template_eval(phase, self.alpha, self.b, self.theta, 1e-9),
+                                      gmm_kernel(phase, self.alpha, self.b, self.theta))
+        self.assertEqual(len(gmm_template._TEMPLATE_CACHE), 0)
+
+        # ✅ Parameter sweeps build their templates for the call only
+        alpha = self.alpha * np.linspace(0.5, 1.5, 100)[:, np.newaxis]
+        x = gmm_template.gmm_template_eval(phase, alpha, self.b, self.theta, 1e-3)
+        self.assertEqual(x.shape, (100, 1000))
+        self.assertLessEqual(np.max(np.abs(x - gmm_kernel(phase, alpha, self.b, self.theta))), 1e-3)
+        self.assertEqual(len(gmm_template._TEMPLATE_CACHE), 0)
+
+    def test_threads(self):
+        """Test that concurrent threads share one read-only template."""
+        gmm_template._TEMPLATE_CACHE.clear()
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            templates = list(pool.map(lambda _: gmm_template.gmm_template(self.alpha, self.b, self.theta, 1e-6),
+                                      range(32)))
+        self.assertTrue(all(template is templates[0] for template in templates))
+        self.assertFalse(templates[0][1].flags.writeable)
+
+    def test_stochastic_closed_form(self):
+        """Test template mode of the closed-form stochastic generator."""
+        gmm_template._TEMPLATE_CACHE.clear()
+        np.random.seed(0)
+        ecg, phi = ecg_gen_stochastic(20000, 500, 1.2, 0, self.alpha, 0, self.b, 0, self.theta, 0, 0.3,
+                                      method='closed_form')
+        np.random.seed(0)
+        ecg_t, phi_t = ecg_gen_stochastic(20000, 500, 1.2, 0, self.alpha, 0, self.b, 0, self.theta, 0, 0.3,
+                                          method='closed_form', max_error=1e-4)
+        self.assertEqual(len(gmm_template._TEMPLATE_CACHE), 1)  # One template serves the beats of all calls
+
+        n_beats = np.concatenate(([0], np.cumsum(np.diff(phi) < 0)))
+        np.testing.assert_array_equal(phi_t, phi, err_msg="Mismatch in phase")
+        self.assertTrue(np.all(np.abs(ecg_t - ecg) <= (2 * n_beats + 1) * 1e-4))
+
+    def test_stochastic_deviations(self):
+        """Test that beat-wise parameter deviations bypass the template."""
+        gmm_template._TEMPLATE_CACHE.clear()
+        np.random.seed(1)
+        ecg, _ = ecg_gen_stochastic(5000, 500, 1.2, 0.1, self.alpha, 0.1, self.b, 0.1, self.theta, 0.05, 0.3,
+                                    method='closed_form')
+        np.random.seed(1)
+        ecg_t, _ = ecg_gen_stochastic(5000, 500, 1.2, 0.1, self.alpha, 0.1, self.b, 0.1, self.theta, 0.05, 0.3,
+                                      method='closed_form', max_error=1e-7)
+        np.testing.assert_array_equal(ecg_t, ecg)
+        self.assertEqual(len(gmm_template._TEMPLATE_CACHE), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
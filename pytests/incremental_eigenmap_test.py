@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from pyoset.generic.eigen_map_distance import eigen_map_distance
+from pyoset.generic.incremental_eigenmap import IncrementalEigenmap
+from pyoset.generic.laplacian_eigenmap import laplacian_eigenmap as lemap_py
+from pytests.spd_helpers import random_spd
+
+
+class TestIncrementalEigenmap(unittest.TestCase):
+    def setUp(self):
+        self.C = random_spd(3, 30, seed=11)
+        self.kappa = 0.5
+
+    def test_append(self):
+        """Test appending in batches against the full distance matrix and eigen-map."""
+        for method in ['EIG', 'CHOLESKY']:
+            with self.subTest(method=method):
+                emap = IncrementalEigenmap(self.kappa, method)
+                for start, end in [(0, 12), (12, 13), (13, 30)]:
+                    emap.append(self.C[:, :, start:end])
+                np.testing.assert_array_equal(emap.delta, eigen_map_distance(self.C, method))
+
+                V, d, delta, similarity, epsilon = emap.embed()
+                V_py, d_py, delta_py, similarity_py, epsilon_py = lemap_py(self.C, self.kappa, method)
+                np.testing.assert_array_equal(d, d_py)
+                self.assertEqual(epsilon, epsilon_py)
+
+    def test_cache(self):
+        """Test reloading the longest cached prefix of the distance matrix."""
+        with tempfile.TemporaryDirectory() as cache_dir:
+            emap = IncrementalEigenmap(self.kappa, 'CHOLESKY', cache_dir=cache_dir)
+            emap.append(self.C[:, :, :20]).append(self.C[:, :, 20:])
+            self.assertEqual(len(os.listdir(cache_dir)), 2)
+
+            # ✅ A new session appending the same matrices in different batches
+            emap_cached = IncrementalEigenmap(self.kappa, 'CHOLESKY', cache_dir=cache_dir)
+            emap_cached.append(self.C[:, :, :25])
+            np.testing.assert_array_equal(emap_cached.delta, emap.delta[:25, :25])
+            emap_cached.append(self.C[:, :, 25:])
+            np.testing.assert_array_equal(emap_cached.delta, emap.delta)
+
+            # ✅ Different matrices do not hit the cache
+            emap_other = IncrementalEigenmap(self.kappa, 'CHOLESKY', cache_dir=cache_dir)
+            emap_other.append(2 * self.C[:, :, :20])
+            self.assertEqual(len(os.listdir(cache_dir)), 4)
+            np.testing.assert_allclose(emap_other.delta, emap.delta[:20, :20], rtol=1e-9, atol=1e-12)
+
+    def test_cache_growth(self):
+        """Test that each append stores only its new columns and that the chain reloads the full matrix."""
+        with tempfile.TemporaryDirectory() as cache_dir:
+            emap = IncrementalEigenmap(self.kappa, 'CHOLESKY', cache_dir=cache_dir)
+            for k in range(30):
+                emap.append(self.C[:, :, k:k + 1])
+
+            stored = 0
+            for name in os.listdir(cache_dir):
+                with np.load(os.path.join(cache_dir, name)) as cached:
+                    stored += cached['columns'].size
+            self.assertEqual(stored, 30 * 31 // 2)
+
+            emap_cached = IncrementalEigenmap(self.kappa, 'CHOLESKY', cache_dir=cache_dir)
+            emap_cached.append(self.C)
+            np.testing.assert_array_equal(emap_cached.delta, emap.delta)
+            self.assertEqual(len(os.listdir(cache_dir)), 30)
+
+    def test_transform(self):
+        """Test the Nystrom out-of-sample embedding."""
+        emap = IncrementalEigenmap(self.kappa, 'CHOLESKY', n_eigs=4).append(self.C[:, :, :25])
+        V, d, delta, similarity, epsilon = emap.embed()
+
+        np.testing.assert_allclose(emap.transform(self.C[:, :, :5]), V[:5], atol=1e-10)
+        self.assertEqual(emap.transform(self.C[:, :, 25:]).shape, (5, 4))
+
+        # ✅ Appending does not change the last eigen-map
+        emap.append(self.C[:, :, 25:])
+        np.testing.assert_allclose(emap.transform(self.C[:, :, :5]), V[:5], atol=1e-10)
+
+
+if __name__ == '__main__':
+    unittest.main()
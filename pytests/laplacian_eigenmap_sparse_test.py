@@ -0,0 +1,71 @@
+import unittest
+import numpy as np
+import scipy.sparse as sp
+from pyoset.generic.laplacian_eigenmap import laplacian_eigenmap as lemap_py
+from pytests.spd_helpers import random_spd
+
+
+class TestLaplacianEigenmapSparse(unittest.TestCase):
+    def setUp(self):
+        self.C = random_spd(3, 60, seed=3)
+        self.kappa = 0.5
+
+    def test_partial_eigs(self):
+        """Test the top eigenpairs from eigsh against the full eigen-decomposition."""
+        V, d, delta, similarity, epsilon = lemap_py(self.C, self.kappa)
+        V_p, d_p, delta_p, similarity_p, epsilon_p = lemap_py(self.C, self.kappa, n_eigs=4)
+
+        self.assertEqual(V_p.shape, (60, 4))
+        np.testing.assert_allclose(d_p, d[:4].real, atol=1e-10, err_msg="Mismatch in eigenvalues")
+        np.testing.assert_allclose(np.abs(np.sum(V_p * V[:, :4].real, axis=0)), 1, atol=1e-8,
+                                   err_msg="Mismatch in eigenvectors")
+        np.testing.assert_array_equal(similarity_p, similarity)
+
+    def test_knn_graph(self):
+        """Test the sparse k-NN similarity graph."""
+        V, d, delta, similarity, epsilon = lemap_py(self.C, self.kappa, n_neighbors=8, n_eigs=4)
+        _, d_dense, delta_dense, _, epsilon_dense = lemap_py(self.C, self.kappa, n_eigs=4)
+
+        self.assertTrue(sp.issparse(similarity))
+        self.assertTrue(sp.issparse(delta))
+        self.assertEqual((similarity - similarity.T).nnz, 0)
+        self.assertTrue(np.all(similarity.getnnz(axis=1) >= 9))
+        self.assertEqual(epsilon, epsilon_dense)
+        dense = similarity.toarray()
+        np.testing.assert_allclose(dense[dense > 0], np.exp(-delta_dense / epsilon)[dense > 0])
+        np.testing.assert_allclose(delta.toarray()[dense > 0], delta_dense[dense > 0], rtol=1e-12, atol=1e-12)
+        np.testing.assert_allclose(d[0], 1, atol=1e-10)  # Leading eigenvalue of a normalized graph
+
+        # ✅ Exact nearest neighbours of every node
+        nearest = np.sort(np.argsort(delta_dense, axis=1)[:, :9], axis=1)
+        for i in range(60):
+            self.assertTrue(set(nearest[i]) <= set(similarity[i].indices))
+
+        # ✅ Keeping all neighbours reproduces the dense similarity
+        _, d_full, _, similarity_full, _ = lemap_py(self.C, self.kappa, n_neighbors=59, n_eigs=4)
+        np.testing.assert_allclose(similarity_full.toarray(), np.exp(-delta_dense / epsilon))
+        np.testing.assert_allclose(d_full, d_dense, atol=1e-10)
+
+    def test_knn_tiles(self):
+        """Test that tiling, worker processes and the metrics give the same k-NN graph."""
+        _, d, delta, similarity, epsilon = lemap_py(self.C, self.kappa, n_neighbors=8, n_eigs=4)
+        for method, workers, block_size in [('EIG', 1, 7), ('CHOLESKY', 1, 16), ('CHOLESKY', 2, 13)]:
+            with self.subTest(method=method, workers=workers, block_size=block_size):
+                _, d_t, delta_t, similarity_t, epsilon_t = lemap_py(self.C, self.kappa, method, workers,
+                                                                   n_neighbors=8, n_eigs=4, block_size=block_size)
+                np.testing.assert_allclose(epsilon_t, epsilon, rtol=1e-12)
+                np.testing.assert_allclose(delta_t.toarray(), delta.toarray(), rtol=1e-10, atol=1e-12)
+                np.testing.assert_allclose(similarity_t.toarray(), similarity.toarray(), rtol=1e-10, atol=1e-12)
+                np.testing.assert_allclose(d_t, d, atol=1e-10)
+
+        # ✅ Log-Euclidean metric, against its dense distance matrix
+        _, _, delta_le, _, epsilon_le = lemap_py(self.C, self.kappa, n_eigs=4, metric='LOG_EUCLIDEAN')
+        _, _, delta_t, similarity_t, epsilon_t = lemap_py(self.C, self.kappa, n_neighbors=8, n_eigs=4,
+                                                          metric='LOG_EUCLIDEAN', block_size=11)
+        np.testing.assert_allclose(epsilon_t, epsilon_le, rtol=1e-10)
+        dense = delta_t.toarray()
+        np.testing.assert_allclose(dense[dense > 0], delta_le[dense > 0], rtol=1e-10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+import numpy as np
+from pyoset.ecg.ecg_polarity import _multirate_design, ecg_polarity, lp_filter_zero_phase
+from pyoset.ecg.ecg_polarity import _EDGE_TOL, _butter_transient
+
+
+class TestLpFilterMultirate(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.fs = 1000
+        t = np.arange(60 * self.fs) / self.fs
+        baseline = 0.5 * np.sin(2 * np.pi * 0.2 * t) + 0.3 * np.sin(2 * np.pi * 1.0 * t + 1)
+        beats = np.sin(np.pi * 1.1 * t)**40
+        self.ecg = (np.array([1, -1, 0.5])[:, np.newaxis] * beats + baseline
+                    + 0.05 * rng.standard_normal((3, len(t))))
+
+    def test_multirate(self):
+        """Test the multirate baseline against the full-rate one, including the record ends."""
+        for length in [self.ecg.shape[1], self.ecg.shape[1] - 7]:  # Lengths divisible by the factor or not
+            full = lp_filter_zero_phase(self.ecg[:, :length], 3.0, self.fs)
+            edge = _butter_transient(3.0, self.fs, _EDGE_TOL)
+            for factor in [4, 'auto']:
+                with self.subTest(length=length, factor=factor):
+                    multirate = lp_filter_zero_phase(self.ecg[:, :length], 3.0, self.fs, factor)
+                    self.assertEqual(multirate.shape, full.shape)
+                    error = multirate - full
+                    self.assertLess(np.std(error) / np.std(full), 2e-4)
+                    self.assertLess(np.max(np.abs(error)), 5e-4)
+
+                    # ✅ Full-rate baseline near the record ends
+                    np.testing.assert_allclose(multirate[:, :edge], full[:, :edge], rtol=0, atol=1e-10)
+                    np.testing.assert_allclose(multirate[:, -edge:], full[:, -edge:], rtol=0, atol=1e-10)
+
+        # ✅ Records too short for the multirate filter are filtered at the full rate
+        short = self.ecg[:, :2 * self.fs]
+        np.testing.assert_array_equal(lp_filter_zero_phase(short, 3.0, self.fs, 4),
+                                      lp_filter_zero_phase(short, 3.0, self.fs))
+
+        full = lp_filter_zero_phase(self.ecg, 3.0, self.fs)
+
+        np.testing.assert_array_equal(lp_filter_zero_phase(self.ecg, 3.0, self.fs, 1), full)
+        np.testing.assert_array_equal(ecg_polarity(self.ecg, self.fs, factor='auto'), [True, False, True])
+
+        # ✅ factor='auto' filters at the full rate where the multirate baseline is not faster
+        low_rate = self.ecg[:, ::4]
+        np.testing.assert_array_equal(lp_filter_zero_phase(low_rate, 3.0, self.fs / 4, 'auto'),
+                                      lp_filter_zero_phase(low_rate, 3.0, self.fs / 4))
+
+    def test_tones(self):
+        """Test the multirate response to sinusoids in and above the baseline band, including mains."""
+        t = np.arange(60 * self.fs) / self.fs
+        tones = np.sin(2 * np.pi * np.array([0.2, 1, 2, 3, 5, 10, 50, 60])[:, np.newaxis] * t)
+        error = lp_filter_zero_phase(tones, 3.0, self.fs, 'auto') - lp_filter_zero_phase(tones, 3.0, self.fs)
+        self.assertLess(np.max(np.abs(error)), 3e-4)
+
+    def test_design_cache(self):
+        """Test that filter designs are reused."""
+        _multirate_design.cache_clear()
+        lp_filter_zero_phase(self.ecg, 3.0, self.fs, 8)
+        lp_filter_zero_phase(self.ecg[:1], 3.0, self.fs, 8)
+        lp_filter_zero_phase(self.ecg, 2.0, 2 * self.fs, 8)  # The reduced-rate filter depends on fc and fs
+        lp_filter_zero_phase(self.ecg[:2], 2, 2000, 8)
+        info = _multirate_design.cache_info()
+        self.assertEqual((info.hits, info.misses), (2, 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
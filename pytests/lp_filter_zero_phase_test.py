@@ -0,0 +1,49 @@
+import unittest
+import numpy as np
+import scipy.signal as signal
+from pyoset.ecg.ecg_polarity import ECGPolarity, _butter_sos, butter_sos, lp_filter_zero_phase
+
+
+class TestLpFilterZeroPhase(unittest.TestCase):
+    def setUp(self):
+        self.ecg = np.random.default_rng(0).standard_normal((12, 5000))
+        self.fs = 500
+
+    def test_sos(self):
+        """Test the second-order-section filter against transfer-function filtfilt."""
+        b, a = signal.butter(2, 3.0 / (self.fs / 2), btype='low', analog=False)
+        np.testing.assert_allclose(lp_filter_zero_phase(self.ecg, 3.0, self.fs),
+                                   signal.filtfilt(b, a, self.ecg, axis=1), atol=1e-12)
+
+    def test_design_cache(self):
+        """Test that designs are cached and returned as independent copies."""
+        _butter_sos.cache_clear()
+        sos = butter_sos(2, 3.0, self.fs)
+        sos[:] = 0
+        np.testing.assert_array_equal(butter_sos(2, 3.0, 500.0, 'low'),
+                                      signal.butter(2, 3.0, btype='low', output='sos', fs=self.fs))
+        butter_sos(4, (0.5, 40.0), self.fs, 'bandpass')
+        np.testing.assert_array_equal(butter_sos(4, [0.5, 40.0], self.fs, 'bandpass'),
+                                      butter_sos(4, np.array([0.5, 40]), self.fs, 'bandpass'))
+        info = _butter_sos.cache_info()
+        self.assertEqual((info.hits, info.misses), (3, 2))
+
+    def test_workers(self):
+        """Test that splitting the leads across threads gives the same result."""
+        baseline = lp_filter_zero_phase(self.ecg, 3.0, self.fs)
+        for workers in [2, 5, 12, 20, None]:
+            with self.subTest(workers=workers):
+                np.testing.assert_array_equal(lp_filter_zero_phase(self.ecg, 3.0, self.fs, workers=workers), baseline)
+        np.testing.assert_array_equal(lp_filter_zero_phase(self.ecg, 3.0, self.fs, 'auto', workers=3),
+                                      lp_filter_zero_phase(self.ecg, 3.0, self.fs, 'auto'))
+
+        # ✅ Chunked polarity
+        estimators = [ECGPolarity(self.fs, workers=workers) for workers in [1, 4]]
+        for estimator in estimators:
+            for start in range(0, self.ecg.shape[1], 1000):
+                estimator.update(self.ecg[:, start:start + 1000])
+        np.testing.assert_array_equal(estimators[1].polarity()[1], estimators[0].polarity()[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import pickle
+import unittest
+import numpy as np
+import scipy.stats as stats
+from pyoset.generic.moments import Moments, moments
+from pyoset.generic.skew import skew as py_skew
+
+
+class TestMoments(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.x = np.vstack([rng.exponential(1.0, 5000), -rng.exponential(2.0, 5000), rng.standard_normal(5000)])
+
+    def test_moments(self):
+        """Test the single-pass moments against NumPy and SciPy, for several block sizes."""
+        for block_size in [1, 7, 1000, 65536]:
+            with self.subTest(block_size=block_size):
+                acc = moments(self.x, order=4, block_size=block_size)
+                self.assertEqual(acc.count, 5000)
+                np.testing.assert_allclose(acc.mean, np.mean(self.x, axis=1), rtol=1e-12)
+                np.testing.assert_allclose(acc.std(), np.std(self.x, axis=1), rtol=1e-12)
+                np.testing.assert_allclose(acc.variance(ddof=1), np.var(self.x, axis=1, ddof=1), rtol=1e-12)
+                np.testing.assert_allclose(acc.skewness(), stats.skew(self.x, axis=1), rtol=1e-10)
+                np.testing.assert_allclose(acc.kurtosis(), stats.kurtosis(self.x, axis=1), rtol=1e-10)
+                np.testing.assert_allclose(acc.kurtosis(fisher=False), stats.kurtosis(self.x, axis=1, fisher=False),
+                                           rtol=1e-10)
+
+    def test_merge(self):
+        """Test merging accumulators of chunks, including pickled ones as sent between processes."""
+        reference = moments(self.x, order=4)
+        parts = [pickle.loads(pickle.dumps(moments(self.x[:, start:start + 1300], order=4)))
+                 for start in range(0, 5000, 1300)]
+        merged = Moments(3, order=4)
+        for part in parts[::-1]:
+            merged.merge(part)
+        merged.merge(Moments(3, order=4))  # Empty accumulator
+
+        for name in ['count', 'mean', 'm2', 'm3', 'm4']:
+            np.testing.assert_allclose(getattr(merged, name), getattr(reference, name), rtol=1e-10)
+
+    def test_offset(self):
+        """Test that a large offset does not destroy the skewness (raw moments would cancel)."""
+        skw, m, sd = py_skew(self.x + 1e6)
+        np.testing.assert_allclose(skw, stats.skew(self.x, axis=1), rtol=1e-6)
+        np.testing.assert_allclose(m, np.mean(self.x, axis=1) + 1e6)
+
+        skw, m, sd = py_skew(np.ones((2, 100)))
+        np.testing.assert_array_equal(skw, [0, 0])
+        np.testing.assert_array_equal(sd, [0, 0])
+
+    def test_constant(self):
+        """Test that constant channels whose value is not exactly representable have no skewness or kurtosis."""
+        x = np.full((4, 1000), 0.1) * np.array([1, -3, 1e8 / 3, 0])[:, np.newaxis]
+        for block_size in [7, 65536]:
+            with self.subTest(block_size=block_size):
+                acc = moments(x, order=4, block_size=block_size)
+                np.testing.assert_array_equal(acc.constant(), [True] * 4)
+                np.testing.assert_array_equal(acc.skewness(), [np.nan] * 4)
+                np.testing.assert_array_equal(acc.kurtosis(), [np.nan] * 4)
+        np.testing.assert_array_equal(py_skew(np.full((2, 7), 0.1))[0], [0, 0])
+
+        # ✅ Variations just above the rounding of the mean are not constant
+        x = 1e4 + 1e-9 * np.random.default_rng(1).standard_normal((1, 1000))
+        self.assertFalse(moments(x).constant()[0])
+        np.testing.assert_allclose(moments(x).skewness(), stats.skew(x, axis=1), rtol=1e-6)
+
+
+if __name__ == '__main__':
+    unittest.main()
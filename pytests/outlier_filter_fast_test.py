@@ -0,0 +1,140 @@
+import unittest
+import numpy as np
+from pyoset.generic.outlier_filter import outlier_filter as py_filter, OutlierFilter
+from pyoset.generic.quantile_sketch import QuantileSketch
+
+
+def loop_filter(x_raw, method, half_wlen, percentile):
+    """Reference per-sample implementation of outlier_filter."""
+    df = np.diff(x_raw, axis=1)
+    diff_threshold = np.percentile(np.abs(df), percentile, axis=1)
+    x_filtered = np.copy(x_raw)
+    T = x_raw.shape[1]
+    for t in range(T):
+        window = x_raw[:, max(0, t - half_wlen):min(T, t + half_wlen + 1)]
+        avg = np.mean(window, axis=1) if method == 'MEAN' else np.median(window, axis=1)
+        replace = np.abs(x_raw[:, t] - avg) >= diff_threshold
+        x_filtered[replace, t] = avg[replace]
+    return x_filtered
+
+
+class TestOutlierFilterFast(unittest.TestCase):
+    def test_windowed_engine(self):
+        """Test the windowed engine against the per-sample loop."""
+        rng = np.random.default_rng(0)
+
+        # ✅ Test cases
+        test_cases = [
+            (rng.standard_normal((10, 50)), 'MEAN', 5, 95),
+            (rng.standard_normal((5, 100)), 'MEDIAN', 10, 90),
+            (np.ones((10, 30)) * 50, 'MEAN', 3, 99),
+            (np.linspace(0, 1, 200).reshape(10, 20), 'MEDIAN', 4, 97),
+            (rng.standard_normal((3, 7)), 'MEDIAN', 5, 95),  # Record shorter than the window
+            (rng.standard_normal((3, 7)), 'MEAN', 5, 95),
+        ]
+
+        for x_raw, method, half_wlen, percentile in test_cases:
+            with self.subTest(method=method, shape=x_raw.shape, half_wlen=half_wlen):
+                py_result = py_filter(x_raw, method, half_wlen, percentile)
+                ref_result = loop_filter(x_raw, method, half_wlen, percentile)
+
+                np.testing.assert_allclose(py_result, ref_result, atol=1e-12, rtol=0, err_msg="Mismatch in filtered output")
+
+    def test_streaming_filter(self):
+        """Test the streaming OutlierFilter against the batch function."""
+        rng = np.random.default_rng(1)
+        x_raw = rng.standard_normal((4, 1000))
+        x_raw[:, ::37] += 8.0  # Spikes
+        diff_threshold = np.percentile(np.abs(np.diff(x_raw, axis=1)), 95, axis=1)
+
+        for method in ['MEAN', 'MEDIAN']:
+            for half_wlen in [0, 1, 5]:
+                with self.subTest(method=method, half_wlen=half_wlen):
+                    stream = OutlierFilter(method, half_wlen, diff_threshold=diff_threshold)
+
+                    # ✅ Feed random-sized chunks, including empty ones
+                    outputs, t = [], 0
+                    while t < x_raw.shape[1]:
+                        n = int(rng.integers(0, 40))
+                        outputs.append(stream.process(x_raw[:, t:t + n]))
+                        t += n
+                    outputs.append(stream.flush())
+                    py_result = np.concatenate(outputs, axis=1)
+
+                    ref_result = py_filter(x_raw, method, half_wlen, diff_threshold=diff_threshold)
+                    np.testing.assert_allclose(py_result, ref_result, atol=1e-12, rtol=0, err_msg="Mismatch in streamed output")
+
+    def test_streaming_warmup(self):
+        """Test thresholds estimated from the first warmup samples, with small first chunks."""
+        rng = np.random.default_rng(3)
+        x_raw = rng.standard_normal((3, 600))
+        x_raw[:, ::29] += 8.0  # Spikes
+
+        for first in [0, 1, 2]:
+            with self.subTest(first=first):
+                stream = OutlierFilter('MEDIAN', 5, warmup=100)
+                outputs = [stream.process(x_raw[:, :first])]
+                self.assertEqual(outputs[0].shape, (3, 0))
+                for t in range(first, x_raw.shape[1], 50):
+                    outputs.append(stream.process(x_raw[:, t:t + 50]))
+                outputs.append(stream.flush())
+                py_result = np.concatenate(outputs, axis=1)
+
+                diff_threshold = np.percentile(np.abs(np.diff(x_raw[:, :100], axis=1)), 95, axis=1)
+                np.testing.assert_array_equal(stream.diff_threshold, diff_threshold)
+                ref_result = py_filter(x_raw, 'MEDIAN', 5, diff_threshold=diff_threshold)
+                np.testing.assert_allclose(py_result, ref_result, atol=1e-12, rtol=0, err_msg="Mismatch in streamed output")
+
+        # ✅ Records shorter than the warmup, down to a single sample
+        for T in [40, 2, 1]:
+            with self.subTest(T=T):
+                stream = OutlierFilter('MEAN', 3, warmup=100)
+                outputs = [stream.process(x_raw[:, t:t + 1]) for t in range(T)]
+                py_result = np.concatenate(outputs + [stream.flush()], axis=1)
+                ref_result = x_raw[:, :1] if T == 1 else py_filter(x_raw[:, :T], 'MEAN', 3)
+                np.testing.assert_allclose(py_result, ref_result, atol=1e-12, rtol=0, err_msg="Mismatch in short record")
+
+        with self.assertRaises(ValueError):
+            OutlierFilter(warmup=1)
+
+    def test_flush_without_samples(self):
+        """Test flushing a stream that received no samples, and a scalar threshold."""
+        self.assertEqual(OutlierFilter('MEAN', 2, diff_threshold=1.0).flush().shape, (0, 0))
+        self.assertEqual(OutlierFilter('MEAN', 2).flush().shape, (0, 0))
+        self.assertEqual(OutlierFilter('MEAN', 2, diff_threshold=np.ones(3)).flush().shape, (3, 0))
+        self.assertEqual(OutlierFilter('MEAN', 2, sketch=QuantileSketch(4)).flush().shape, (4, 0))
+
+        x_raw = np.random.default_rng(4).standard_normal((2, 200))
+        stream = OutlierFilter('MEAN', 2, diff_threshold=1.0)
+        py_result = np.concatenate([stream.process(x_raw[:, t:t + 30]) for t in range(0, 200, 30)] + [stream.flush()],
+                                   axis=1)
+        np.testing.assert_allclose(py_result, py_filter(x_raw, 'MEAN', 2, diff_threshold=1.0), atol=1e-12, rtol=0)
+
+    def test_rolling_thresholds(self):
+        """Test rolling-percentile thresholds against per-window np.percentile."""
+        rng = np.random.default_rng(2)
+        x_raw = rng.standard_normal((3, 400))
+        x_raw[:, 100:200] *= 10  # Noisy segment
+        T = x_raw.shape[1]
+        df = np.abs(np.diff(x_raw, axis=1))
+
+        for half_wlen, percentile in [(0, 95), (4, 50), (20, 90), (20, 37.5)]:
+            with self.subTest(half_wlen=half_wlen, percentile=percentile):
+                # ✅ Reference: windows of 2 * half_wlen + 1 differences, shifted inside the record at the edges
+                wlen = 2 * half_wlen + 1
+                diff_threshold = np.empty(x_raw.shape)
+                for t in range(T):
+                    start = min(max(0, min(t, T - 2) - half_wlen), T - 1 - wlen)
+                    diff_threshold[:, t] = np.percentile(df[:, start:start + wlen], percentile, axis=1)
+
+                py_result = py_filter(x_raw, 'MEDIAN', 5, percentile, threshold_half_wlen=half_wlen)
+                ref_result = np.copy(x_raw)
+                avg = py_filter(x_raw, 'MEDIAN', 5, diff_threshold=np.zeros(3))
+                replace = np.abs(x_raw - avg) >= diff_threshold
+                ref_result[replace] = avg[replace]
+
+                np.testing.assert_array_equal(py_result, ref_result, err_msg="Mismatch in filtered output")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+import numpy as np
+from pyoset.generic.quantile_sketch import QuantileSketch
+from pyoset.generic.outlier_filter import outlier_filter as py_filter
+
+
+class TestQuantileSketch(unittest.TestCase):
+    def test_exact_below_capacity(self):
+        """Test that the sketch equals np.percentile before any compaction."""
+        rng = np.random.default_rng(0)
+        x = rng.standard_normal((3, 500))
+
+        sketch = QuantileSketch(3, k=1024)
+        sketch.update(x[:, :200])
+        sketch.update(x[:, 200:])
+
+        np.testing.assert_allclose(sketch.percentile([10, 50, 95]), np.percentile(x, [10, 50, 95], axis=1).T,
+                                   atol=1e-12, rtol=0, err_msg="Mismatch in exact percentiles")
+
+    def test_merged_rank_error(self):
+        """Test the rank error of sketches updated chunk by chunk and merged across workers."""
+        rng = np.random.default_rng(1)
+        x = np.abs(rng.standard_normal((3, 400000))) * np.array([[1.0], [5.0], [0.1]])
+
+        # ✅ Four "workers", each fed every fourth chunk
+        k = 1024
+        sketches = [QuantileSketch(3, k=k, seed=i) for i in range(4)]
+        for i, chunk in enumerate(np.array_split(x, 40, axis=1)):
+            sketches[i % 4].update(chunk)
+        sketch = sketches[0]
+        for other in sketches[1:]:
+            sketch.merge(other)
+
+        self.assertTrue(np.all(sketch.count == x.shape[1]))
+
+        # ✅ Documented bound with delta = 1e-6
+        bound = 4 * np.sqrt(np.log(2 / 1e-6)) / k
+        for q in [5, 50, 95, 99]:
+            with self.subTest(q=q):
+                est = sketch.percentile(q)
+                rank = np.mean(x <= est[:, np.newaxis], axis=1)
+                self.assertLess(np.max(np.abs(rank - q / 100)), bound)
+
+    def test_outlier_filter_thresholds(self):
+        """Test outlier_filter with thresholds taken from a sketch."""
+        rng = np.random.default_rng(2)
+        x_raw = rng.standard_normal((4, 300))
+
+        sketch = QuantileSketch(4)
+        sketch.update(np.abs(np.diff(x_raw, axis=1)))
+
+        np.testing.assert_allclose(py_filter(x_raw, 'MEDIAN', 5, 95, sketch=sketch), py_filter(x_raw, 'MEDIAN', 5, 95),
+                                   atol=1e-12, rtol=0, err_msg="Mismatch in filtered output")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from pyoset.ecg.robust_weighted_average import robust_weighted_average as rwa_py
+
+
+class TestRobustWeightedAverageBatch(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.x = rng.standard_normal((6, 9, 40)) * rng.uniform(0.2, 2, (6, 9, 1))
+
+    def test_result_structure(self):
+        """Test that all four outputs are returned for any number of beats."""
+        for num_beats in [1, 2, 3, 9]:
+            with self.subTest(num_beats=num_beats):
+                x = self.x[0, :num_beats]
+                result = rwa_py(x)
+                self.assertEqual(len(result), 4)
+                mn, vr_mn, md, vr_md = result
+                np.testing.assert_array_equal(result.mn, mn)
+                np.testing.assert_array_equal(result.vr_md, vr_md)
+                self.assertEqual(md.shape, (40,))
+                if num_beats == 1:
+                    np.testing.assert_array_equal(md, x[0])
+                    np.testing.assert_array_equal(vr_md, np.zeros(40))
+
+    def test_batch(self):
+        """Test a 3-D input against one call per record."""
+        result = rwa_py(self.x)
+        for r in range(len(self.x)):
+            for value, value_r in zip(result, rwa_py(self.x[r])):
+                np.testing.assert_array_equal(value[r], value_r)
+
+    def test_ragged(self):
+        """Test records with different numbers of beats, given by counts or by a mask."""
+        counts = np.array([9, 1, 2, 5, 3, 8])
+        x = self.x.copy()
+        for r, count in enumerate(counts):
+            x[r, count:] = np.nan  # Padding must not leak into the results
+
+        result = rwa_py(x, counts=counts)
+        for r, count in enumerate(counts):
+            for value, value_r in zip(result, rwa_py(self.x[r, :count])):
+                np.testing.assert_allclose(value[r], value_r, rtol=1e-12, atol=1e-14)
+
+        # ✅ Arbitrary valid beats
+        mask = np.random.default_rng(1).random((6, 9)) < 0.6
+        mask[:, 0] = True
+        result = rwa_py(self.x, mask=mask)
+        for r in range(len(self.x)):
+            for value, value_r in zip(result, rwa_py(self.x[r, mask[r]])):
+                np.testing.assert_allclose(value[r], value_r, rtol=1e-12, atol=1e-14)
+
+        with self.assertRaises(ValueError):
+            rwa_py(self.x, counts=np.zeros(6, dtype=int))
+
+    def test_blocks(self):
+        """Test the column-streamed mode on a memory-mapped matrix against the in-memory path."""
+        x = np.random.default_rng(2).standard_normal((501, 97)) * np.linspace(0.5, 3, 501)[:, np.newaxis] + 1
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            np.save(os.path.join(tmp_dir, 'x.npy'), x)
+            x_mmap = np.load(os.path.join(tmp_dir, 'x.npy'), mmap_mode='r')
+            for block_size in [1, 10, 97, 200]:
+                with self.subTest(block_size=block_size):
+                    result = rwa_py(x_mmap, block_size=block_size)
+                    for value, value_py in zip(result, rwa_py(x)):
+                        np.testing.assert_allclose(value, value_py, rtol=1e-12, atol=1e-15)
+            del x_mmap
+
+        for num_beats in [1, 2]:
+            for value, value_py in zip(rwa_py(x[:num_beats], block_size=16), rwa_py(x[:num_beats])):
+                np.testing.assert_allclose(value, value_py, rtol=1e-12, atol=1e-15)
+
+        with self.assertRaises(ValueError):
+            rwa_py(self.x, block_size=10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+import numpy as np
+from pyoset.ecg.robust_weighted_average import robust_weighted_average as rwa_py
+from pyoset.ecg.robust_weighted_average import RobustWeightedAverage
+
+
+class TestRobustWeightedAverageStream(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.template = np.sin(np.linspace(0, 6, 100))
+        self.x = self.template + rng.standard_normal((400, 100)) * rng.uniform(0.1, 2, (400, 1))
+
+    def test_batch(self):
+        """Test the streaming average against the batch function."""
+        stream = RobustWeightedAverage()
+        for k, beat in enumerate(self.x):
+            mn, vr_mn = stream.update(beat)
+            if k < 2:
+                # ✅ Equal to the batch result for up to two beats
+                mn_py, vr_mn_py = rwa_py(self.x[:k + 1])[:2]
+                np.testing.assert_allclose(mn, mn_py, atol=1e-12)
+                np.testing.assert_allclose(vr_mn, vr_mn_py, atol=1e-12)
+
+            # ✅ Variance of the beats around the streaming average
+            np.testing.assert_allclose(vr_mn, np.mean((self.x[:k + 1] - mn)**2, axis=0), atol=1e-10)
+
+        # ✅ Close to the batch result once the running mean has settled
+        mn_py = rwa_py(self.x)[0]
+        self.assertLess(np.max(np.abs(mn - mn_py)), 0.05)
+        self.assertEqual(stream.num_beats, 400)
+
+    def test_forgetting(self):
+        """Test that the forgetting factor follows a change of the beat morphology."""
+        x = np.concatenate([self.x, 2 * self.template + self.x[:, ::-1] - self.template[::-1]])
+        stream = RobustWeightedAverage(forgetting=0.95)
+        static = RobustWeightedAverage()
+        for beat in x:
+            mn, vr_mn = stream.update(beat)
+            mn_static, _ = static.update(beat)
+
+        self.assertLess(np.mean(np.abs(mn - 2 * self.template)), 0.1)
+        self.assertGreater(np.mean(np.abs(mn_static - 2 * self.template)), 0.2)
+
+        with self.assertRaises(ValueError):
+            RobustWeightedAverage(forgetting=0)
+
+    def test_forgetting_weights(self):
+        """Test the forgetting factor against explicit exponentially weighted sums."""
+        lam = 0.9
+        x = self.x[:60]
+        stream = RobustWeightedAverage(forgetting=lam)
+        weights = np.empty(len(x))
+        for n, beat in enumerate(x, start=1):
+            mn, vr_mn = stream.update(beat)
+
+            # ✅ Reference: beat i is discounted by lam^(n - i) in every sum
+            discount = lam**np.arange(n - 1, -1, -1)[:, np.newaxis]
+            running_mean = np.sum(discount * x[:n], axis=0) / np.sum(discount)
+            if n == 2:
+                weights[0] = 1 / np.var(x[0] - running_mean)
+            if n >= 2:
+                weights[n - 1] = 1 / np.var(beat - running_mean)
+                w = discount[:, 0] * weights[:n]
+                mn_ref = np.sum(w[:, np.newaxis] * x[:n], axis=0) / np.sum(w)
+            else:
+                mn_ref = beat
+            vr_mn_ref = np.sum(discount * (x[:n] - mn_ref)**2, axis=0) / np.sum(discount)
+
+            np.testing.assert_allclose(mn, mn_ref, rtol=1e-10, atol=1e-12)
+            np.testing.assert_allclose(vr_mn, vr_mn_ref, rtol=1e-10, atol=1e-12)
+
+
+if __name__ == '__main__':
+    unittest.main()
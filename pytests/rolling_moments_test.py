@@ -0,0 +1,63 @@
+import unittest
+import numpy as np
+import scipy.stats as stats
+from pyoset.generic.moments import rolling_moments
+from pyoset.generic.skew import skew as py_skew
+
+
+class TestRollingMoments(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        T = 6000
+        t = np.arange(T) / 500
+        self.x = np.vstack([rng.exponential(1.0, T),
+                            100 * np.sin(2 * np.pi * 0.1 * t) + rng.standard_normal(T)**3,  # Baseline wander
+                            1e4 + rng.standard_normal(T),  # Large offset
+                            np.r_[np.ones(T // 2), rng.standard_normal(T - T // 2)]])  # Constant, then noise
+
+    def test_rolling_moments(self):
+        """Test the rolling moments against skew() of every window, for overlapping and disjoint windows."""
+        for wlen, hop, block_size in [(250, 1, None), (300, 40, None), (250, 33, 7), (200, 200, None), (5, 3, None)]:
+            with self.subTest(wlen=wlen, hop=hop, block_size=block_size):
+                skw, m, sd = rolling_moments(self.x, wlen, hop, block_size)
+                K = 1 + (self.x.shape[1] - wlen) // hop
+                self.assertEqual(skw.shape, (4, K))
+
+                reference = [py_skew(self.x[:, k * hop:k * hop + wlen]) for k in range(K)]
+                np.testing.assert_allclose(skw, np.array([r[0] for r in reference]).T, rtol=1e-7, atol=1e-8)
+                np.testing.assert_allclose(m, np.array([r[1] for r in reference]).T, rtol=1e-12, atol=1e-12)
+                np.testing.assert_allclose(sd, np.array([r[2] for r in reference]).T, rtol=1e-9, atol=1e-10)
+
+    def test_scipy(self):
+        """Test the rolling skewness against scipy.stats.skew of a strided view of the windows."""
+        windows = np.lib.stride_tricks.sliding_window_view(self.x[:3], 128, axis=1)[:, ::16]
+        skw, _, sd = rolling_moments(self.x[:3], 128, 16)
+        np.testing.assert_allclose(skw, stats.skew(windows, axis=2), rtol=1e-7)
+        np.testing.assert_allclose(sd, np.std(windows, axis=2), rtol=1e-9)
+
+    def test_amplitude_step(self):
+        """Test quiet windows after an amplitude step of 1e6 within a block against the moments of every window."""
+        rng = np.random.default_rng(1)
+        x = rng.exponential(1.0, (2, 4000))
+        x[:, 1000:2000] *= 1e6
+        x[1, 2000:] += 1e6  # Step of the baseline as well
+        for wlen, hop in [(64, 64), (64, 1), (250, 33)]:
+            with self.subTest(wlen=wlen, hop=hop):
+                windows = np.lib.stride_tricks.sliding_window_view(x, wlen, axis=1)[:, ::hop]
+                skw, m, sd = rolling_moments(x, wlen, hop, block_size=-(-4000 // hop))
+                np.testing.assert_allclose(skw, stats.skew(windows, axis=2), rtol=1e-7, atol=1e-8)
+                np.testing.assert_allclose(m, np.mean(windows, axis=2), rtol=1e-12)
+                np.testing.assert_allclose(sd, np.std(windows, axis=2), rtol=1e-9)
+
+    def test_invalid(self):
+        """Test the window length and step checks."""
+        with self.assertRaises(ValueError):
+            rolling_moments(self.x, 0)
+        with self.assertRaises(ValueError):
+            rolling_moments(self.x, self.x.shape[1] + 1)
+        with self.assertRaises(ValueError):
+            rolling_moments(self.x, 10, hop=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
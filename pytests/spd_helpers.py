@@ -0,0 +1,12 @@
+import numpy as np
+
+
+def random_spd(N, K, seed=0, dof=None):
+    """
+    K random SPD covariance-like matrices stacked as an (N, N, K) tensor: sample covariances of dof (default: N + 2)
+    standard normal samples with channel scales drawn from [0.5, 2] per matrix.
+    """
+    dof = N + 2 if dof is None else dof
+    rng = np.random.default_rng(seed)
+    A = rng.standard_normal((N, dof, K)) * rng.uniform(0.5, 2, (N, 1, K))
+    return np.einsum('ijk,ljk->ilk', A, A) / dof
@@ -0,0 +1,49 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from pyoset.generic.windowed_covariance import windowed_covariance
+
+
+def reference_covariance(x, wlen, hop):
+    """Per-window loop with np.cov."""
+    K = 1 + (x.shape[1] - wlen) // hop
+    return np.stack([np.cov(x[:, k * hop:k * hop + wlen]) for k in range(K)], axis=2)
+
+
+class TestWindowedCovariance(unittest.TestCase):
+    def setUp(self):
+        self.x = np.random.default_rng(0).standard_normal((4, 5000)) + 10
+
+    def test_windows(self):
+        """Test overlapping, non-overlapping and coprime windows against a per-window loop."""
+        for wlen, hop in [(200, 200), (200, 100), (200, 40), (200, 33), (100, 250)]:
+            with self.subTest(wlen=wlen, hop=hop):
+                C = windowed_covariance(self.x, wlen, hop, block_size=7)
+                np.testing.assert_allclose(C, reference_covariance(self.x, wlen, hop), atol=1e-12)
+
+    def test_shrinkage(self):
+        """Test shrinkage towards a scaled identity."""
+        x = self.x[:, :300]
+        C = windowed_covariance(x, 3, 1)  # Rank-deficient windows
+        C_shrunk = windowed_covariance(x, 3, 1, shrinkage=0.1)
+
+        trace = np.einsum('iik->k', C)
+        np.testing.assert_allclose(np.einsum('iik->k', C_shrunk), trace)
+        np.testing.assert_allclose(C_shrunk, 0.9 * C + 0.1 * np.eye(4)[:, :, np.newaxis] * trace / 4, atol=1e-12)
+        self.assertTrue(np.all(np.linalg.eigvalsh(np.moveaxis(C_shrunk, 2, 0)) > 0))
+
+    def test_memmap(self):
+        """Test writing into a memory-mapped tensor."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            out = np.lib.format.open_memmap(os.path.join(tmp_dir, 'C.npy'), mode='w+', shape=(4, 4, 49))
+            C = windowed_covariance(self.x, 200, 100, out=out, block_size=10)
+            self.assertIs(C, out)
+            out.flush()
+            np.testing.assert_allclose(np.load(os.path.join(tmp_dir, 'C.npy')),
+                                       reference_covariance(self.x, 200, 100), atol=1e-12)
+            del C, out
+
+
+if __name__ == '__main__':
+    unittest.main()